@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+fetch_feed.py の処理ごとの速さを測るベンチマーク
+ネットワークは使わず、bench/fixtures/ に保存したフィード・ページだけで動きます。
+
+    python bench/bench_pipeline.py                  # 計測して baseline.json と比較
+    python bench/bench_pipeline.py --save-baseline  # 今回の結果を基準として保存
+    python bench/bench_pipeline.py -k scrape        # 名前に scrape を含む処理だけ
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# キャッシュ類は使い捨ての場所に置く（import 前に設定する）
+os.environ["FEED_CACHE_DIR"] = tempfile.mkdtemp(prefix="feedbench-")
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import feedparser  # noqa: E402
+import fetch_feed as ff  # noqa: E402
+
+RSS_FIXTURES = {
+    "hardfork": "hardfork.xml",
+    "karpathy_yt": "karpathy_yt.xml",
+    "wired_jp": "wired_jp.xml",
+}
+PAGE_FIXTURES = {
+    "every": "every.html",
+    "amodei": "amodei.html",
+    "tedchiang": "newyorker.html",
+}
+YOUTUBE_FIXTURE = "youtube_search.html"
+RENDER_SIZES = (10, 100, 1000)
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FixtureResponse:
+    """conditional_get の代わりに返す、保存済みデータのレスポンス"""
+
+    status_code = 200
+    ok = True
+    from_cache = True   # 計測のたびにキャッシュへ書き込まない
+
+    def __init__(self, content, content_type):
+        self.content = content
+        self.headers = {"Content-Type": content_type}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def raise_for_status(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubTranslator:
+    """区切りを保ったまま訳したことにする翻訳（通信しない）"""
+
+    def translate(self, text):
+        return text.replace("]] ", "]] 訳: ") if "[[" in text else f"訳: {text}"
+
+
+def measure(func, repeat):
+    """func を repeat 回実行した時間の中央値（ミリ秒）と、1回分のピークメモリ（KB）"""
+    func()  # 初回の import やキャッシュの影響を除く
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+# ===================== 計測する処理 =====================
+
+def build_stages():
+    """(名前, 関数) のリストを返す。準備にかかる時間は計測に含めない"""
+    feeds = {key: feedparser.parse(read_fixture(name)) for key, name in RSS_FIXTURES.items()}
+    entries = [entry for feed in feeds.values() for entry in feed.entries]
+    summaries = [entry.get("summary", entry.get("description", "")) for entry in entries]
+    tmp_dir = os.environ["FEED_CACHE_DIR"]
+    stages = []
+
+    stages.append(("clean_html", lambda: [ff.clean_html(summary) for summary in summaries]))
+    stages.append(("extract_image_from_entry",
+                   lambda: [ff.extract_image_from_entry(entry) for entry in entries]))
+    stages.append(("summarize_entry", lambda: [ff.summarize_entry(entry) for entry in entries]))
+
+    for key, name in RSS_FIXTURES.items():
+        body = read_fixture(name)
+
+        def run_fetch_rss(key=key, body=body):
+            ff.conditional_get = lambda source_key, url, **kw: (
+                FixtureResponse(body, "application/rss+xml"), None)
+            ff.ITEM_STORE = ff.ItemStore(os.path.join(tmp_dir, "items.json"))
+            ff.fetch_rss(key, ff.SOURCES[key])
+        stages.append((f"fetch_rss[{key}]", run_fetch_rss))
+
+    for key, name in PAGE_FIXTURES.items():
+        markup = read_fixture(name).decode("utf-8")
+        source = ff.SOURCES[key]
+        stages.append((f"scrape[{key}]", lambda markup=markup, key=key, source=source:
+                       ff.extract_links(markup, key, source["url"], source["scrape"])))
+
+    youtube = read_fixture(YOUTUBE_FIXTURE)
+
+    def run_yt_initial_data():
+        chunks = (youtube[i:i + 65536] for i in range(0, len(youtube), 65536))
+        renderers = []
+        for renderer in ff.iter_video_renderers(chunks):
+            renderers.append(renderer)
+            if len(renderers) >= 5:
+                break
+        return renderers
+    stages.append(("ytInitialData", run_yt_initial_data))
+
+    feed_items = []
+    for key, feed in feeds.items():
+        for entry in feed.entries:
+            title = entry.get("title", "")
+            summary, image = ff.summarize_entry(entry)
+            feed_items.append({
+                "source_key": key,
+                "source": ff.SOURCES[key]["name"],
+                "title": title,
+                "summary": summary,
+                "link": entry.get("link", ""),
+                "date": ff.parse_date(entry),
+                "time_ago": ff.time_ago(ff.parse_date(entry)),
+                "image": image,
+                "original_lang": "en" if ff.is_english(title) else "ja",
+            })
+
+    stages.append(("dedupe_items", lambda: ff.dedupe_items(feed_items)))
+
+    def run_translate_items():
+        ff.get_translator = StubTranslator
+        ff.TRANSLATE_LIMITER = ff.TokenBucket(10000, capacity=10000, max_rate=10000)
+        ff.TRANSLATION_CACHE = ff.TranslationCache(":memory:")
+        ff.translate_items(copy.deepcopy(feed_items))
+    stages.append(("translate_items", run_translate_items))
+
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+    if Image is not None:
+        photo = io.BytesIO()
+        Image.new("RGB", (2400, 1600), (180, 120, 90)).save(photo, "JPEG", quality=90)
+        photo = photo.getvalue()
+        stages.append(("make_thumbnail", lambda: ff.make_thumbnail(photo)))
+
+    output_path = os.path.join(tmp_dir, "bench.html")
+    for size in RENDER_SIZES:
+        items = [dict(feed_items[i % len(feed_items)]) for i in range(size)]
+        stages.append((f"generate_html[{size}]",
+                       lambda items=items: ff.generate_html(items, output_path)))
+    return stages
+
+
+def with_silenced_output(func):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return func()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+# ===================== 実行 =====================
+
+def main():
+    parser = argparse.ArgumentParser(description="fetch_feed.py のオフラインベンチマーク")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="各処理の繰り返し回数")
+    parser.add_argument("-k", "--filter", default="", help="名前にこの文字列を含む処理だけ測る")
+    parser.add_argument("--save-baseline", action="store_true", help="結果を baseline.json に保存")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="比較に使う基準ファイル")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    print(f"{'処理':<28}{'時間(ms)':>10}{'ピーク(KB)':>12}{'基準(ms)':>10}{'比':>8}")
+    for name, func in with_silenced_output(build_stages):
+        if args.filter not in name:
+            continue
+        elapsed, peak = with_silenced_output(lambda: measure(func, args.repeat))
+        results[name] = {"ms": round(elapsed, 3), "peak_kb": round(peak, 1)}
+        base = baseline.get(name, {}).get("ms")
+        ratio = f"{elapsed / base:.2f}x" if base else "-"
+        base_text = f"{base:.2f}" if base else "-"
+        print(f"{name:<28}{elapsed:>10.2f}{peak:>12.0f}{base_text:>10}{ratio:>8}")
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"\n💾 {args.baseline} に保存しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,40 @@ My Daily Feed - 情報キュレーションツール
 英語コンテンツは自動で日本語に翻訳されます。
 """
 
-import feedparser
+import time
+
+MODULE_LOAD_STARTED = time.perf_counter()
+
+# feedparser / bs4 / deep_translator は使うときに lazy_import() で読み込む
 import requests
-from bs4 import BeautifulSoup
+import urllib3
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime, timezone, timedelta
-from deep_translator import GoogleTranslator
+import argparse
+import codecs
+import collections
+import gzip
+import hashlib
+import importlib
+import io
+import itertools
 import json
 import html
+import os
+import random
 import re
-import time
+import sqlite3
+import struct
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit, urlunsplit
+from xml.etree import ElementTree
 
 JST = timezone(timedelta(hours=9))
 
@@ -41,6 +66,7 @@ SOURCES = {
         "url": "https://www.youtube.com/feeds/videos.xml?channel_id=UCXUPKJO5MZQN11PqgIvyuvQ",
         "emoji": "🤖",
         "platform": "YouTube",
+        "poll_minutes": (60, 48 * 60),   # 投稿は年に数回
     },
     "hardfork": {
         "name": "Hard Fork",
@@ -55,6 +81,19 @@ SOURCES = {
         "url": "https://every.to",
         "emoji": "📝",
         "platform": "Newsletter",
+        "scrape": {
+            "heading_links": True,
+            "link_pattern": r"^/[a-z-]+/[a-z0-9-]+",
+            "min_href_len": 16,
+            "title_from": "descendants",
+            "max_title_len": 200,
+            "dedupe_titles": True,
+            "skip_words": ["subscribe", "sign up", "log in", "newsletter", "cookie",
+                           "introducing every", "pricing", "about", "advertise",
+                           "view all", "read more", "careers", "contact"],
+            "image_levels": 5,
+            "time_ago": "最近",
+        },
     },
     "moltbook": {
         "name": "Moltbook",
@@ -69,6 +108,11 @@ SOURCES = {
         "url": "https://darioamodei.com",
         "emoji": "🏛️",
         "platform": "Blog",
+        "scrape": {
+            "skip_words": ["home", "about", "contact", "subscribe", "menu", "navigation",
+                           "dario amodei", "privacy", "terms"],
+            "image_levels": 4,
+        },
     },
     "technium": {
         "name": "Kevin Kelly",
@@ -83,6 +127,13 @@ SOURCES = {
         "url": "https://www.newyorker.com/contributors/ted-chiang",
         "emoji": "✍️",
         "platform": "The New Yorker",
+        "poll_minutes": (60, 48 * 60),
+        "scrape": {
+            "link_pattern": r"/(magazine|culture|tech|news|science)/",
+            "skip_words": ["subscribe", "sign in", "newsletter", "new yorker", "podcast",
+                           "cartoon", "crossword", "goings on"],
+            "image_levels": 5,
+        },
     },
     "wired_jp": {
         "name": "WIRED JAPAN",
@@ -97,6 +148,28 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"
 }
 
+# 実行をまたいで残すキャッシュ類の置き場所（GitHub Actions では actions/cache で復元する）
+CACHE_DIR = os.environ.get("FEED_CACHE_DIR", ".feedcache")
+
+_modules = {}
+_modules_lock = threading.Lock()
+
+
+def lazy_import(name):
+    """モジュールを初めて使うときに import し、かかった時間を計測に残す
+
+    必要なソースの種類や英語アイテムがなければ、重い依存は読み込まれない。
+    """
+    module = _modules.get(name)
+    if module is None:
+        with _modules_lock:
+            if name not in _modules:
+                started = time.perf_counter()
+                _modules[name] = importlib.import_module(name)
+                METRICS.add_import(name, time.perf_counter() - started)
+            module = _modules[name]
+    return module
+
 # ===================== 二十四節気・七十二候 =====================
 
 # 2026年の二十四節気と七十二候（暦生活・国立天文台ベース）
@@ -196,7 +269,15 @@ def get_seasonal_message():
 
 # ===================== 翻訳 =====================
 
-translator = GoogleTranslator(source="en", target="ja")
+_translators = threading.local()
+
+
+def get_translator():
+    """スレッドごとの GoogleTranslator を返す（インスタンスはスレッド間で共有しない）"""
+    if not hasattr(_translators, "translator"):
+        translator_class = lazy_import("deep_translator").GoogleTranslator
+        _translators.translator = translator_class(source="en", target="ja")
+    return _translators.translator
 
 
 def is_english(text):
@@ -207,18 +288,318 @@ def is_english(text):
     return ascii_chars / max(len(text), 1) > 0.8
 
 
-def translate_to_japanese(text):
-    """英語テキストを日本語に翻訳（無料のGoogle Translate使用）"""
-    if not text or not is_english(text):
-        return text
+TRANSLATION_CACHE_MAX_ENTRIES = 5000   # これを超えたら古く使われていない順に削除
+TRANSLATION_CACHE_MAX_AGE_DAYS = 30    # この日数使われなかった翻訳は削除
+
+
+class TranslationCache:
+    """翻訳結果を SQLite に保存するメモ化キャッシュ
+
+    キーは言語ペアと正規化した原文のハッシュ。まだ見たことのない文だけを
+    翻訳サービスに送るので、毎時の実行でも通信は新着分だけになる。
+    訳文は put のたびにコミットするので、実行が途中で落ちても訳した分は残る。
+    ヒットしたときの last_used の更新は溜めておき、evict でまとめて書く。
+    """
+
+    def __init__(self, path, source="en", target="ja"):
+        self.path = path
+        self.pair = f"{source}:{target}"
+        self.lock = threading.Lock()
+        self.conn = None
+        self.touched = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY, translated TEXT NOT NULL,"
+                " created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+        return self.conn
+
+    def _key(self, text):
+        normalized = re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+        return hashlib.sha256(f"{self.pair}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, text):
+        """翻訳済みならその結果を、なければ None を返す"""
+        key = self._key(text)
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[key] = time.time()
+            return row[0]
+
+    def put(self, text, translated):
+        """訳文を保存してすぐコミットする（翻訳サービスに払った分を失わないように）"""
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                (self._key(text), translated, now, now),
+            )
+            conn.commit()
+
+    def evict(self, max_entries=TRANSLATION_CACHE_MAX_ENTRIES,
+              max_age_days=TRANSLATION_CACHE_MAX_AGE_DAYS):
+        """ヒットした分の last_used を書き、古い翻訳と上限を超えた分を削除して保存する"""
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.executemany("UPDATE translations SET last_used = ? WHERE key = ?",
+                                  [(used, key) for key, used in self.touched.items()])
+            self.touched.clear()
+            cutoff = time.time() - max_age_days * 86400
+            self.conn.execute("DELETE FROM translations WHERE last_used < ?", (cutoff,))
+            self.conn.execute(
+                "DELETE FROM translations WHERE key NOT IN ("
+                " SELECT key FROM translations ORDER BY last_used DESC LIMIT ?)",
+                (max_entries,),
+            )
+            self.conn.commit()
+
+    def report(self):
+        total = self.hits + self.misses
+        if total:
+            print(f"  📦 翻訳キャッシュ: ヒット {self.hits} / ミス {self.misses}"
+                  f" ({self.hits / total:.0%})")
+
+
+TRANSLATION_CACHE = TranslationCache(os.path.join(CACHE_DIR, "translations.sqlite3"))
+
+
+TRANSLATE_MAX_CHARS = 4500     # 翻訳サービスに1回で送れる文字数
+TRANSLATE_BATCH_CHARS = 4500   # まとめ翻訳1回分の上限。0 ならまとめない
+TRANSLATE_WORKERS = 3          # 同時に翻訳リクエストを送るワーカー数
+TRANSLATE_RATE = 2.0           # 1秒あたりのリクエスト数（初期値）
+TRANSLATE_RATE_MIN = 0.2       # 抑制されたときに下げる下限
+TRANSLATE_RATE_MAX = 5.0       # 成功が続いたときに上げる上限
+TRANSLATE_BURST = 2            # まとめて送ってよいリクエスト数
+TRANSLATE_BUDGET = 60          # 翻訳フェーズの持ち時間（秒）
+
+# まとめ翻訳の区切り。翻訳で空白が入っても拾えるようにゆるく照合する
+BATCH_MARKER = "[[{}]]"
+BATCH_MARKER_RE = re.compile(r"\[\[\s*(\d+)\s*\]\]")
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限
+
+    成功するたびに少しずつ速く、429 やブロックを受けたら半分の速さにする。
+    """
+
+    def __init__(self, rate, capacity=TRANSLATE_BURST,
+                 min_rate=TRANSLATE_RATE_MIN, max_rate=TRANSLATE_RATE_MAX, increase=0.1):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.granted = 0
+        self.throttled = 0
+
+    def acquire(self, cancel=None):
+        """トークンを1つ取るまで待つ。cancel がセットされたら False を返す"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.granted += 1
+                    return True
+                wait_seconds = (1 - self.tokens) / self.rate
+            if cancel is None:
+                time.sleep(wait_seconds)
+            elif cancel.wait(wait_seconds):
+                return False
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.throttled += 1
+
+
+TRANSLATE_LIMITER = TokenBucket(TRANSLATE_RATE)
+
+
+def is_throttled(error):
+    """翻訳サービスからの 429 やブロックによるエラーかどうか"""
+    if error.__class__.__name__ in ("TooManyRequests", "RequestError"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "too many" in message or "blocked" in message
+
+
+def request_translation(text, cancel=None):
+    """キャッシュを通さず翻訳サービスに問い合わせる。失敗・中止したら None"""
+    if cancel is not None and cancel.is_set():
+        return None
+    if HTTP_MODE == "replay":
+        return None  # 再生中は通信しない。キャッシュにない訳は次回に回す
+    if not TRANSLATE_LIMITER.acquire(cancel):
+        return None
+    started = time.monotonic()
     try:
-        if len(text) > 4500:
-            text = text[:4500]
-        result = translator.translate(text)
-        return result if result else text
+        result = get_translator().translate(text)
     except Exception as e:
+        throttled = is_throttled(e)
+        METRICS.add_translation(len(text), time.monotonic() - started, False, throttled)
+        if throttled:
+            TRANSLATE_LIMITER.on_throttle()
+            print(f"    🐢 翻訳サービスに抑制されたため速度を {TRANSLATE_LIMITER.rate:.1f}回/秒 に下げます")
         print(f"    ⚠️ 翻訳スキップ: {str(e)[:50]}")
+        return None
+    METRICS.add_translation(len(text), time.monotonic() - started, True)
+    TRANSLATE_LIMITER.on_success()
+    return result or None
+
+
+def translate_to_japanese(text):
+    """英語テキストを日本語に翻訳（無料のGoogle Translate使用）
+
+    翻訳キャッシュにあればそれを使い、サービスには問い合わせない。
+    """
+    if not text or not is_english(text):
         return text
+    if len(text) > TRANSLATE_MAX_CHARS:
+        text = text[:TRANSLATE_MAX_CHARS]
+    cached = TRANSLATION_CACHE.get(text)
+    if cached is not None:
+        return cached
+    result = request_translation(text)
+    if result is None:
+        return text
+    TRANSLATION_CACHE.put(text, result)
+    return result
+
+
+def pack_batches(texts, batch_chars):
+    """区切りを含めて batch_chars に収まるように文をまとめる"""
+    batches = []
+    batch, size = [], 0
+    for text in texts:
+        cost = len(text) + len(BATCH_MARKER.format(len(batch))) + 2
+        if batch and size + cost > batch_chars:
+            batches.append(batch)
+            batch, size = [], 0
+            cost = len(text) + len(BATCH_MARKER.format(0)) + 2
+        batch.append(text)
+        size += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class BatchMisaligned(ValueError):
+    """まとめ翻訳の結果の区切りが、送った文と対応していない"""
+
+
+def translate_batch(texts, cancel=None):
+    """複数の文を区切り付きで1回にまとめて翻訳する
+
+    リクエストが失敗・中止したら None を返す。返ってきた区切りの番号が
+    順番どおりに揃っていなければ BatchMisaligned を投げる。
+    """
+    payload = "\n".join(
+        f"{BATCH_MARKER.format(n)} {' '.join(text.split())}" for n, text in enumerate(texts)
+    )
+    result = request_translation(payload, cancel)
+    if result is None:
+        return None
+    parts = BATCH_MARKER_RE.split(result)
+    numbers = [int(n) for n in parts[1::2]]
+    segments = [segment.strip() for segment in parts[2::2]]
+    if parts[0].strip() or numbers != list(range(len(texts))) or not all(segments):
+        raise BatchMisaligned(f"区切り {numbers} / 送った文 {len(texts)}件")
+    return segments
+
+
+def translate_many(texts, batch_chars=TRANSLATE_BATCH_CHARS,
+                   workers=TRANSLATE_WORKERS, budget=TRANSLATE_BUDGET):
+    """複数の英文をまとめて翻訳し、{原文: 訳文} を返す
+
+    キャッシュにない文だけを上限いっぱいまで詰め、複数のワーカーから
+    TRANSLATE_LIMITER の速度で送る。区切りがずれて返ってきたまとめだけを
+    1件ずつ翻訳し直し、リクエスト自体が失敗・抑制されたまとめは原文のまま残す
+    （1件ずつに分けると、抑制されているときほどリクエストが増えるため）。
+    持ち時間を使い切ったら残りは中止して原文のままにする。応答しないリクエストは
+    止められないが、DaemonPool のスレッドなので待たずに先へ進み、プロセスの終了も止めない。
+    """
+    results = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        if not text or not is_english(text):
+            results[text] = text
+            continue
+        cached = TRANSLATION_CACHE.get(text[:TRANSLATE_MAX_CHARS])
+        if cached is not None:
+            results[text] = cached
+        else:
+            pending.append(text)
+
+    if not pending:
+        return results
+
+    if batch_chars:
+        batches = pack_batches(pending, batch_chars)
+    else:
+        batches = [[text] for text in pending]
+
+    cancel = threading.Event()
+
+    def run(batch):
+        if len(batch) > 1:
+            try:
+                translated = translate_batch(batch, cancel)
+            except BatchMisaligned:
+                print(f"    ⚠️ まとめ翻訳の区切りがずれたため1件ずつ翻訳します（{len(batch)}件）")
+            else:
+                return translated or [None] * len(batch)
+        return [request_translation(text[:TRANSLATE_MAX_CHARS], cancel) for text in batch]
+
+    granted_before = TRANSLATE_LIMITER.granted
+    executor = DaemonPool(max(1, workers), thread_name_prefix="translate")
+    futures = {executor.submit(run, batch): batch for batch in batches}
+    done, not_done = wait(futures, timeout=budget)
+    if not_done:
+        cancel.set()
+        skipped = sum(len(futures[future]) for future in not_done)
+        print(f"  ⏰ 翻訳の持ち時間（{budget:.0f}秒）を使い切ったため {skipped}件は原文のまま表示します")
+    executor.shutdown()
+
+    for text in pending:
+        results[text] = text
+    for future in done:
+        batch = futures[future]
+        for text, result in zip(batch, future.result()):
+            if result is None:
+                continue
+            TRANSLATION_CACHE.put(text[:TRANSLATE_MAX_CHARS], result)
+            results[text] = result
+
+    print(f"  📨 翻訳リクエスト {TRANSLATE_LIMITER.granted - granted_before}回"
+          f"（未翻訳 {len(pending)}件, 速度 {TRANSLATE_LIMITER.rate:.1f}回/秒,"
+          f" 抑制 {TRANSLATE_LIMITER.throttled}回）")
+    return results
 
 
 # ===================== ユーティリティ =====================
@@ -249,12 +630,146 @@ def time_ago(dt):
             return f"{months}ヶ月前"
 
 
+class DaemonPool:
+    """締め切りで見切ることのある処理を動かすスレッドプール
+
+    ThreadPoolExecutor のスレッドは終了時に join されるので、応答しないリクエスト
+    （翻訳ライブラリの通信には timeout がない）が1つでもあるとプロセスが終わらない。
+    こちらはデーモンスレッドで動かすので、待つのをやめた処理がプロセスの終了を止めない。
+    submit は ThreadPoolExecutor と同じく、wait() にそのまま渡せる Future を返す。
+    """
+
+    def __init__(self, max_workers, thread_name_prefix="pool"):
+        self.max_workers = max_workers
+        self.prefix = thread_name_prefix
+        self.tasks = collections.deque()
+        self.lock = threading.Lock()
+        self.workers = 0
+        self.started = 0
+
+    def submit(self, fn, *args):
+        future = Future()
+        with self.lock:
+            self.tasks.append((future, fn, args))
+            if self.workers < self.max_workers:
+                self.workers += 1
+                self.started += 1
+                threading.Thread(target=self._work, name=f"{self.prefix}_{self.started}",
+                                 daemon=True).start()
+        return future
+
+    def _work(self):
+        while True:
+            with self.lock:
+                if not self.tasks:
+                    self.workers -= 1
+                    return
+                future, fn, args = self.tasks.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def shutdown(self):
+        """まだ始まっていない処理を取り消す。動いている処理は待たない"""
+        with self.lock:
+            tasks, self.tasks = self.tasks, collections.deque()
+        for future, _, _ in tasks:
+            future.cancel()
+
+
+SUMMARY_MAX_CHARS = 300   # サマリーとして残す文字数
+HTML_FEED_CHUNK = 2048    # HTMLParser に一度に渡す文字数（必要なものが揃えばそこで止める）
+
+
+class SummaryParser(HTMLParser):
+    """HTMLを1回だけ走査して、テキスト（limit 字まで）と最初の <img> を拾う
+
+    script / style の中身は読み飛ばす。テキストが上限に達し、画像も見つかれば
+    （または画像が不要なら）done になり、呼び出し側は残りを渡さずに済む。
+    少しずつ feed すると1つのテキストが分かれて届くので、次のタグ（か close()）まで
+    溜めてからまとめて1つの断片にする。
+    """
+
+    SKIP_TAGS = ("script", "style")
+
+    def __init__(self, limit, want_image=True):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.want_image = want_image
+        self.parts = []
+        self.pending = []
+        self.length = 0
+        self.skipping = 0
+        self.image = ""
+
+    @property
+    def text_done(self):
+        return self.length >= self.limit
+
+    @property
+    def done(self):
+        return self.text_done and (bool(self.image) or not self.want_image)
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in self.SKIP_TAGS:
+            self.skipping += 1
+        elif tag == "img" and self.want_image and not self.image:
+            self.image = dict(attrs).get("src") or ""
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in self.SKIP_TAGS and self.skipping:
+            self.skipping -= 1
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_data(self, data):
+        if not (self.skipping or self.text_done):
+            self.pending.append(data)
+
+    def flush(self):
+        """溜めておいたテキストを1つの断片にする"""
+        text = "".join(self.pending).strip()
+        self.pending = []
+        if text:
+            self.parts.append(text)
+            self.length += len(text) + 1
+
+    def close(self):
+        super().close()
+        self.flush()
+
+    def text(self):
+        self.flush()
+        return " ".join(self.parts)[:self.limit]
+
+
+def summarize_html(markup, limit=SUMMARY_MAX_CHARS, want_image=True):
+    """HTMLから (テキスト, 最初の画像URL) を取り出す。タグがなければ解析しない"""
+    if not markup:
+        return "", ""
+    if "<" not in markup:
+        return html.unescape(markup).strip()[:limit], ""
+    parser = SummaryParser(limit, want_image)
+    for start in range(0, len(markup), HTML_FEED_CHUNK):
+        parser.feed(markup[start:start + HTML_FEED_CHUNK])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.text(), parser.image
+
+
 def clean_html(text):
     """HTMLタグを除去してプレーンテキストに"""
-    if not text:
-        return ""
-    soup = BeautifulSoup(text, "html.parser")
-    return soup.get_text(separator=" ", strip=True)[:300]
+    return summarize_html(text, want_image=False)[0]
 
 
 def parse_date(entry):
@@ -291,8 +806,8 @@ def parse_youtube_time(time_text):
     return None
 
 
-def extract_image_from_entry(entry):
-    """RSSエントリからサムネイル画像URLを取得"""
+def media_image_from_entry(entry):
+    """media:thumbnail / media:content / enclosure から画像URLを取得（HTMLは見ない）"""
     # media:thumbnail
     media_thumb = entry.get("media_thumbnail")
     if media_thumb and isinstance(media_thumb, list) and len(media_thumb) > 0:
@@ -313,354 +828,1517 @@ def extract_image_from_entry(entry):
         if enc.get("type", "").startswith("image"):
             return enc.get("href", enc.get("url", ""))
 
-    # image in feed content / summary
-    summary = entry.get("summary", "") or entry.get("content", [{}])[0].get("value", "") if entry.get("content") else ""
-    if summary:
-        soup = BeautifulSoup(summary, "html.parser")
-        img = soup.find("img", src=True)
-        if img:
-            return img["src"]
-
     return ""
 
 
-# ===================== データ取得 =====================
+def entry_content(entry):
+    """content:encoded などの本文HTML（なければ空文字）"""
+    content = entry.get("content") or [{}]
+    return content[0].get("value", "")
 
-def fetch_rss(source_key, source):
-    """RSSフィードからアイテムを取得"""
-    items = []
-    max_age = source.get("max_age_days")
-    try:
-        print(f"  📡 RSS取得中: {source['name']} ({source['platform']})...")
-        feed = feedparser.parse(source["url"])
-        for entry in feed.entries[:10]:
-            title = entry.get("title", "（タイトルなし）")
-            link = entry.get("link", "")
-            summary = clean_html(entry.get("summary", entry.get("description", "")))
-            pub_date = parse_date(entry)
-            image = extract_image_from_entry(entry)
-
-            # YouTube動画の場合、サムネイルを生成
-            if not image and "youtube.com" in link:
-                vid_match = re.search(r'v=([^&]+)', link)
-                if vid_match:
-                    image = f"https://i.ytimg.com/vi/{vid_match.group(1)}/mqdefault.jpg"
-
-            if max_age and pub_date:
-                age_days = (datetime.now(timezone.utc) - pub_date).days
-                if age_days > max_age:
-                    continue
 
-            if len(items) >= 5:
+def summarize_entry(entry, limit=SUMMARY_MAX_CHARS):
+    """RSSエントリの (サマリー, 画像URL) を返す
+
+    サマリーのHTMLはテキストと画像を同時に拾うため1回だけ解析する。
+    画像は media 系の要素を優先し、なければサマリー、次に本文の <img> を探す。
+    """
+    raw_summary = entry.get("summary", entry.get("description", ""))
+    media_image = media_image_from_entry(entry)
+    summary, image = summarize_html(raw_summary, limit, want_image=not media_image)
+    image = media_image or image
+    if not image:
+        content = entry_content(entry)
+        if content and content != raw_summary:
+            image = summarize_html(content, limit=0)[1]
+    return summary, image
+
+
+def extract_image_from_entry(entry):
+    """RSSエントリからサムネイル画像URLを取得"""
+    return summarize_entry(entry, limit=0)[1]
+
+
+class ImageIndex:
+    """アンカーから最も近い <img> を引くための索引
+
+    各要素について「その部分木で文書順に最初に出てくる src 付き <img>」を
+    文書全体を1回なめるだけで求めておく。各 <img> から祖先へ登っていき、
+    すでに登録済みの祖先に着いたら止めるので、全体で要素数に比例する手間で済む。
+    """
+
+    def __init__(self, soup, base_url=None):
+        self.base_url = base_url
+        self.first_img = {}
+        for img in soup.find_all("img", src=True):
+            node = img.parent
+            while node is not None and id(node) not in self.first_img:
+                self.first_img[id(node)] = img
+                node = node.parent
+
+    def nearest(self, a_tag, max_levels=5):
+        """a_tag の親から max_levels 段まで遡って見つかった画像のURL（なければ空文字）
+
+        data: URI の画像は飛ばし、相対パスは base_url を基準に絶対URLにする。
+        """
+        parent = a_tag.parent
+        for _ in range(max_levels):
+            if parent is None:
                 break
+            img = self.first_img.get(id(parent))
+            if img is not None and not img["src"].startswith("data:"):
+                src = img["src"]
+                if self.base_url and not src.startswith("http"):
+                    src = urljoin(self.base_url, src)
+                return src
+            parent = parent.parent
+        return ""
 
-            items.append({
-                "source_key": source_key,
-                "title": title,
-                "summary": summary,
-                "link": link,
-                "date": pub_date,
-                "time_ago": time_ago(pub_date),
-                "image": image,
-                "original_lang": "en" if is_english(title) else "ja",
-            })
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
-    return items
 
+# ===================== 計測 =====================
 
-def search_youtube(source_key, source):
-    """YouTube検索で動画を取得"""
-    items = []
-    query = source.get("query", "")
-    max_age = source.get("max_age_days", 90)
+METRICS_MAX_BYTES = 5 * 1024 * 1024   # 記録ファイルがこれを超えたら古い半分を捨てる
+
+
+class Metrics:
+    """1回の実行の計測値を集め、JSON Lines で書き出す
+
+    レコードの種類（kind）は http / source / stage / run の4つ（import にかかった
+    時間と取得スケジュールは run にまとめる）。取得スレッドごとに
+    「いま取得中のソース」を覚えておき、HTTP の計測値をそのソースに集計する。
+    コンソールの絵文字ログはこれまでどおり人向けの表示として残す。
+    """
+
+    def __init__(self):
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.started = time.monotonic()
+        self.records = []
+        self.sources = {}
+        self.translation = {"calls": 0, "chars": 0, "seconds": 0.0, "errors": 0, "throttled": 0}
+        self.imports = {}
+        self.schedule = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def record(self, kind, **fields):
+        record = {"run": self.run_id, "kind": kind,
+                  "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"), **fields}
+        with self.lock:
+            self.records.append(record)
+        return record
+
+    def begin_source(self, source_key):
+        """このスレッドでの以後の HTTP 計測を source_key に集計する"""
+        self.local.source_key = source_key
+        with self.lock:
+            self.sources[source_key] = {"requests": 0, "bytes": 0, "status": None, "cache_hit": None}
+
+    def end_source(self):
+        self.local.source_key = None
+
+    def add_http(self, url, status, size, seconds):
+        source_key = getattr(self.local, "source_key", None)
+        self.record("http", source=source_key, url=url, status=status,
+                    bytes=size, seconds=round(seconds, 3))
+        if source_key is not None:
+            with self.lock:
+                totals = self.sources[source_key]
+                totals["requests"] += 1
+                totals["bytes"] += size
+                totals["status"] = status
+
+    def set_cache_hit(self, hit):
+        source_key = getattr(self.local, "source_key", None)
+        if source_key is not None:
+            with self.lock:
+                self.sources[source_key]["cache_hit"] = hit
+
+    def source_done(self, source_key, items, seconds, outcome):
+        """ソース1件の結果（ok / error / timeout / cancelled / circuit_open）を記録する"""
+        with self.lock:
+            totals = dict(self.sources.get(source_key, {}))
+        self.record("source", source=source_key, outcome=outcome, items=items,
+                    seconds=round(seconds, 3), **totals)
+
+    def add_translation(self, chars, seconds, ok, throttled=False):
+        with self.lock:
+            self.translation["calls"] += 1
+            self.translation["chars"] += chars
+            self.translation["seconds"] += seconds
+            self.translation["errors"] += 0 if ok else 1
+            self.translation["throttled"] += 1 if throttled else 0
+
+    def add_import(self, name, seconds):
+        with self.lock:
+            self.imports[name] = round(seconds, 3)
+
+    def set_schedule(self, schedule):
+        with self.lock:
+            self.schedule = dict(schedule)
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """with ブロックの所要時間を stage レコードとして残す。yield した dict に項目を足せる"""
+        start = time.monotonic()
+        extra = dict(fields)
+        try:
+            yield extra
+        finally:
+            self.record("stage", stage=name, seconds=round(time.monotonic() - start, 3), **extra)
+
+    def summary(self):
+        """実行全体の集計（run レコード）を作る"""
+        sources = [r for r in self.records if r["kind"] == "source"]
+        stages = {r["stage"]: r["seconds"] for r in self.records if r["kind"] == "stage"}
+        translation = dict(self.translation, seconds=round(self.translation["seconds"], 3))
+        return self.record(
+            "run",
+            seconds=round(time.monotonic() - self.started, 3),
+            sources=len(sources),
+            sources_ok=sum(1 for r in sources if r["outcome"] == "ok"),
+            sources_open=sum(1 for r in sources if r["outcome"] == "circuit_open"),
+            items=sum(r["items"] for r in sources),
+            bytes=sum(r.get("bytes", 0) for r in sources),
+            cache_hits=sum(1 for r in sources if r.get("cache_hit")),
+            translation=translation,
+            imports=dict(self.imports),
+            schedule=dict(self.schedule),
+            stages=stages,
+        )
+
+    def write(self, path):
+        """今回のレコードを追記する（大きくなりすぎたら古い半分を捨てる）"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > METRICS_MAX_BYTES:
+            with open(path, encoding="utf-8") as f:
+                lines = f.readlines()
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(lines[len(lines) // 2:])
+        with open(path, "a", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+METRICS = Metrics()
+
+
+def response_bytes(resp):
+    """実際に受信したバイト数（圧縮されていれば圧縮後の大きさ）"""
+    try:
+        return resp.raw.tell()
+    except AttributeError:
+        return len(resp.content or b"")
+
+
+# ===================== HTTPクライアント =====================
+
+HTTP_POOL_PER_HOST = 4        # ホストごとの同時接続数の上限
+HTTP_RETRIES = 3              # 一時的なエラーの再試行回数
+HTTP_BACKOFF = 0.5            # 再試行の初回待ち時間（秒）。以後は倍々
+HTTP_BACKOFF_MAX = 8          # 待ち時間の上限（秒）
+HTTP_RETRY_AFTER_MAX = 30     # これより長い Retry-After は待たずに諦める（秒）
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+# 通信の通り道: "live"（そのまま）/ "record"（記録しながら）/ "replay"（記録から再生）
+HTTP_MODE = "live"
+HTTP_ARCHIVE = None
+REPLAY_LATENCY = False
+
+
+def get_session():
+    """全ての取得処理で共有する requests.Session を返す
+
+    ホストごとにコネクションプールを持ち、keep-alive で TCP/TLS 接続を使い回す。
+    Accept-Encoding は urllib3 が展開できる形式（brotli があれば br も）を送る。
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            pool = {
+                "pool_connections": len(SOURCES),
+                "pool_maxsize": HTTP_POOL_PER_HOST,
+                "pool_block": True,
+            }
+            if HTTP_MODE == "replay":
+                adapter = ReplayAdapter(HTTP_ARCHIVE, REPLAY_LATENCY)
+            elif HTTP_MODE == "record":
+                adapter = RecordingAdapter(HTTP_ARCHIVE, **pool)
+            else:
+                adapter = requests.adapters.HTTPAdapter(**pool)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            session.headers.update(urllib3.util.make_headers(accept_encoding=True))
+            _session = session
+    return _session
+
+
+def set_transport(mode, directory=None, latency=False):
+    """通信を live / record / replay に切り替える
+
+    record は全レスポンスを directory に書き残し、replay はそこから返すだけで
+    ネットワークには出ない。次に get_session() を呼んだときから有効になる。
+    """
+    global HTTP_MODE, HTTP_ARCHIVE, REPLAY_LATENCY, _session
+    with _session_lock:
+        HTTP_MODE = mode
+        HTTP_ARCHIVE = HttpArchive(directory) if directory else None
+        REPLAY_LATENCY = latency
+        _session = None
+
+
+def retry_after_seconds(resp):
+    """Retry-After ヘッダーを秒数にする（秒数と日付の両形式に対応）"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
     try:
-        print(f"  🔍 YouTube検索中: {query}...")
-        encoded_query = requests.utils.quote(query)
-        url = f"https://www.youtube.com/results?search_query={encoded_query}&sp=CAI%3D"
-        resp = requests.get(url, headers=HEADERS, timeout=15)
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
-        match = re.search(r'ytInitialData\s*=\s*({.*?});</script>', resp.text, re.DOTALL)
-        if not match:
-            print("  ⚠️ YouTube検索データが取得できませんでした")
-            return items
+def backoff_seconds(attempt):
+    """ジッター付き指数バックオフ（full jitter）"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF * (2 ** attempt)))
 
-        data = json.loads(match.group(1))
 
+def http_get(url, headers=None, timeout=15, **kwargs):
+    """共有セッションでGETする
+
+    接続エラーと一時的なステータス（429/5xx）はジッター付き指数バックオフで
+    再試行し、Retry-After があればそれに従う。読み込みのタイムアウトは
+    遅いサイトで時間を浪費しないよう再試行しない。
+    ストリーミング（stream=True）のときは読み終えた呼び出し側が計測を記録する。
+    """
+    session = get_session()
+    for attempt in range(HTTP_RETRIES + 1):
+        last_attempt = attempt == HTTP_RETRIES
+        started = time.monotonic()
         try:
-            contents = data['contents']['twoColumnSearchResultsRenderer']['primaryContents']['sectionListRenderer']['contents']
-            for section in contents:
-                video_items = section.get('itemSectionRenderer', {}).get('contents', [])
-                for vi in video_items:
-                    vr = vi.get('videoRenderer')
-                    if not vr:
-                        continue
-                    vid = vr.get('videoId', '')
-                    title = vr.get('title', {}).get('runs', [{}])[0].get('text', '')
-                    channel = vr.get('ownerText', {}).get('runs', [{}])[0].get('text', '')
-                    published = vr.get('publishedTimeText', {}).get('simpleText', '')
-                    # サムネイル取得
-                    thumbs = vr.get('thumbnail', {}).get('thumbnails', [])
-                    thumb_url = thumbs[-1].get('url', '') if thumbs else ''
-                    if not thumb_url and vid:
-                        thumb_url = f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg"
-
-                    if not title or not vid:
+            resp = session.get(url, headers=headers, timeout=timeout, **kwargs)
+        except requests.ConnectionError as e:
+            if last_attempt:
+                raise
+            delay = backoff_seconds(attempt)
+            reason = e.__class__.__name__
+        else:
+            if resp.status_code not in RETRY_STATUSES or last_attempt:
+                if not kwargs.get("stream"):
+                    METRICS.add_http(url, resp.status_code, response_bytes(resp),
+                                     time.monotonic() - started)
+                return resp
+            delay = retry_after_seconds(resp)
+            if delay is None:
+                delay = backoff_seconds(attempt)
+            elif delay > HTTP_RETRY_AFTER_MAX:
+                return resp
+            reason = f"HTTP {resp.status_code}"
+            resp.close()
+        print(f"    🔁 再試行 {attempt + 1}/{HTTP_RETRIES} ({reason}, {delay:.1f}秒後): {url}")
+        time.sleep(delay)
+
+
+# ===================== 記録と再生 =====================
+
+class ReplayMiss(requests.RequestException):
+    """再生中に、アーカイブに記録のないリクエストが来た"""
+
+
+class HttpArchive:
+    """記録・再生用のレスポンス置き場
+
+    index.jsonl に1レスポンス1行でステータス・ヘッダー・所要時間を、
+    bodies/ に本文を内容のハッシュ名で保存する。同じURLが何度も記録されて
+    いれば再生時もその順に返し、使い切ったら最後の記録を返し続ける。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.entries = None
+
+    def add(self, request, resp, body, elapsed):
+        digest = hashlib.sha1(body).hexdigest()
+        body_path = os.path.join(self.directory, "bodies", digest)
+        # 本文は展開済みで保存するので、転送時のエンコーディングは落とす
+        headers = {name: value for name, value in resp.headers.items()
+                   if name.lower() not in ("content-encoding", "content-length",
+                                           "transfer-encoding")}
+        entry = {
+            "method": request.method,
+            "url": request.url,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": headers,
+            "body": digest,
+            "size": len(body),
+            "elapsed": round(elapsed, 4),
+            "offset": round(time.monotonic() - self.started - elapsed, 4),
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self.lock:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            if not os.path.exists(body_path):
+                with open(body_path, "wb") as f:
+                    f.write(body)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def next(self, method, url):
+        """(method, url) の次の記録と本文を返す。なければ (None, None)"""
+        with self.lock:
+            if self.entries is None:
+                self.entries = {}
+                with open(self.index_path, encoding="utf-8") as f:
+                    for line in f:
+                        entry = json.loads(line)
+                        self.entries.setdefault((entry["method"], entry["url"]), []).append(entry)
+            queue = self.entries.get((method, url))
+            if not queue:
+                return None, None
+            entry = queue.pop(0) if len(queue) > 1 else queue[0]
+        with open(os.path.join(self.directory, "bodies", entry["body"]), "rb") as f:
+            return entry, f.read()
+
+
+class RecordingAdapter(requests.adapters.HTTPAdapter):
+    """普段どおり通信し、受け取ったレスポンスをアーカイブに書き残す
+
+    記録のために本文は最後まで読むが、読み終えた本文から iter_content で
+    少しずつ渡せるので、ストリーミングで読む呼び出し側もそのまま動く。
+    """
+
+    def __init__(self, archive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        started = time.monotonic()
+        resp = super().send(request, **kwargs)
+        body = resp.content
+        self.archive.add(request, resp, body, time.monotonic() - started)
+        return resp
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """アーカイブの記録だけでレスポンスを組み立てる（ネットワークに出ない）"""
+
+    def __init__(self, archive, latency=False):
+        super().__init__()
+        self.archive = archive
+        self.latency = latency
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        entry, body = self.archive.next(request.method, request.url)
+        if entry is None:
+            raise ReplayMiss(f"アーカイブに記録がありません: {request.method} {request.url}",
+                             request=request)
+        if self.latency:
+            time.sleep(entry["elapsed"])
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry["reason"]
+        resp.headers = requests.structures.CaseInsensitiveDict(entry["headers"])
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        resp._content = body
+        resp._content_consumed = True
+        return resp
+
+    def close(self):
+        pass
+
+
+# ===================== HTTPキャッシュ =====================
+
+class HttpCache:
+    """ETag / Last-Modified を使った条件付きGETのディスクキャッシュ
+
+    URLごとに検証子と本文を、ソースごとに前回のアイテムを保存する。
+    304 が返ってきたソースは再パースせず前回のアイテムをそのまま使う。
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def _path(self, kind, name):
+        return os.path.join(self.directory, kind, name)
+
+    def _url_path(self, url, suffix):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return self._path("http", f"{digest}.{suffix}")
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """保存済みの (メタ情報, 本文) を返す。なければ (None, None)"""
+        try:
+            with open(self._url_path(url, "json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._url_path(url, "body"), "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def store(self, url, resp, body=None, partial=False):
+        """検証子つきのレスポンスだけを保存する
+
+        partial は本文を途中まで読んで止めたことを示す（body はその読んだ分）。
+        """
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": resp.headers.get("Content-Type", ""),
+            "partial": partial,
+            "saved_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._write(self._url_path(url, "body"), resp.content if body is None else body)
+        self._write(self._url_path(url, "json"), json.dumps(meta).encode("utf-8"))
+
+    def load_items(self, source_key):
+        """前回そのソースから得たアイテムを返す。なければ None"""
+        try:
+            with open(self._path("items", f"{source_key}.json"), encoding="utf-8") as f:
+                return [item_from_json(item) for item in json.load(f)]
+        except (OSError, ValueError):
+            return None
+
+    def store_items(self, source_key, items):
+        """ソースの今回のアイテムを保存する。空のときは前回の中身のある分を上書きしない"""
+        if not items and self.load_items(source_key):
+            return
+        data = json.dumps([item_to_json(item) for item in items], ensure_ascii=False)
+        self._write(self._path("items", f"{source_key}.json"), data.encode("utf-8"))
+
+    def count(self, source_key, hit, size):
+        with self.lock:
+            stat = self.stats.setdefault(source_key, {"hit": 0, "miss": 0, "bytes_saved": 0})
+            stat["hit" if hit else "miss"] += 1
+            if hit:
+                stat["bytes_saved"] += size
+
+    def report(self):
+        """ソースごとのヒット／ミスと節約できた転送量を表示"""
+        if not self.stats:
+            return
+        print("\n📦 HTTPキャッシュ:")
+        total_saved = 0
+        for source_key, stat in sorted(self.stats.items()):
+            total_saved += stat["bytes_saved"]
+            print(f"  {source_key}: ヒット {stat['hit']} / ミス {stat['miss']}"
+                  f" (節約 {stat['bytes_saved'] / 1024:.0f}KB)")
+        print(f"  合計 {total_saved / 1024:.0f}KB の再ダウンロードを省略")
+
+
+HTTP_CACHE = HttpCache(CACHE_DIR)
+
+
+def item_to_json(item):
+    """アイテムを JSON に保存できる形にする（日時は ISO 形式の文字列に）"""
+    data = dict(item)
+    if data.get("date"):
+        data["date"] = data["date"].isoformat()
+    return data
+
+
+def item_from_json(data):
+    """item_to_json の逆。経過時間の表示は今の時刻で計算し直す"""
+    item = dict(data)
+    if item.get("date"):
+        item["date"] = datetime.fromisoformat(item["date"])
+        item["time_ago"] = time_ago(item["date"])
+    return item
+
+
+def conditional_get(source_key, url, timeout=15, stream=False):
+    """条件付きGETでURLを取得する
+
+    (レスポンス, 前回のアイテム) を返す。304 で前回のアイテムが残っていれば
+    それを返すので、呼び出し側はパースを省略できる。アイテムが残っていなければ
+    キャッシュの本文からレスポンスを組み立てて返す。
+    stream=True のときは本文を読まずに返すので、呼び出し側は読み終えたあと
+    finish_streamed_get() でキャッシュに保存し、計測も記録する。304 は本文が
+    ないのでここで記録し、キャッシュから組み立てたレスポンスには from_cache が立つ。
+    """
+    # 記録・再生ではアーカイブだけで再現できるよう、常に本文ごと取得する
+    use_cache = HTTP_MODE == "live"
+    meta, body = HTTP_CACHE.load(url) if use_cache else (None, None)
+    if meta and meta.get("partial") and HTTP_CACHE.load_items(source_key) is None:
+        meta = None  # 途中までの本文しかなく、304 でも組み立て直せない
+    headers = {}
+    if meta:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    started = time.monotonic()
+    resp = http_get(url, headers=headers, timeout=timeout, stream=stream)
+    if resp.status_code == 304 and meta:
+        resp.close()
+        if stream:
+            METRICS.add_http(url, resp.status_code, response_bytes(resp), time.monotonic() - started)
+        HTTP_CACHE.count(source_key, True, len(body))
+        METRICS.set_cache_hit(True)
+        cached_items = HTTP_CACHE.load_items(source_key)
+        if cached_items is not None:
+            return resp, cached_items
+        resp.status_code = 200
+        resp.from_cache = True
+        resp._content = body
+        resp._content_consumed = True
+        resp.headers["Content-Type"] = meta.get("content_type", "")
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        return resp, None
+
+    HTTP_CACHE.count(source_key, False, 0)
+    METRICS.set_cache_hit(False)
+    if resp.ok and use_cache and not stream:
+        HTTP_CACHE.store(url, resp)
+    return resp, None
+
+
+def finish_streamed_get(url, resp, body, partial):
+    """conditional_get(stream=True) の本文を読み終えたら呼ぶ。読んだ分をキャッシュに保存する"""
+    if resp.ok and HTTP_MODE == "live" and not getattr(resp, "from_cache", False):
+        HTTP_CACHE.store(url, resp, bytes(body), partial)
+
+
+# ===================== アイテムストア =====================
+
+ITEM_STORE_MAX_AGE_DAYS = 30   # この日数見かけなかったアイテムはストアから消す
+TRANSLATED_FIELDS = ("title_ja", "title_en", "summary_ja")
+
+
+# 記事の識別には関係ない、計測・共有用のクエリ
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref", "ref_src",
+                   "si", "feature", "spm", "cmpid"}
+TRACKING_PREFIXES = ("utm_",)
+YOUTUBE_HOSTS = {"youtube.com", "m.youtube.com", "music.youtube.com"}
+
+
+def canonical_link(link):
+    """アイテムの識別に使うリンク
+
+    スキームとホストの大小文字、http と https、www.、末尾の /、# 以降、計測用のクエリ
+    （utm_* など）の違いを無視し、残りのクエリは名前順に並べる。YouTube の動画は
+    youtu.be・shorts・モバイル版のどれでも watch?v= の形にそろえる。
+    """
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path.rstrip("/")
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)]
+    video = None
+    if host == "youtu.be":
+        video = path.lstrip("/")
+    elif host in YOUTUBE_HOSTS:
+        if path == "/watch":
+            video = dict(query).get("v")
+        elif path.startswith("/shorts/"):
+            video = path[len("/shorts/"):]
+    if video:
+        return f"https://youtube.com/watch?v={video}"
+    scheme = parts.scheme.lower()
+    if scheme == "http":
+        scheme = "https"
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+def content_hash(*values):
+    return hashlib.sha1("\0".join(v or "" for v in values).encode("utf-8")).hexdigest()
+
+
+class ItemStore:
+    """正規化済みのアイテムを正規化リンクごとに保存するストア
+
+    翻訳結果と初出時刻も一緒に持つので、前回と同じアイテムは整形や翻訳を
+    やり直さずに済む。前回生成したページの指紋も保存し、何も変わっていなければ
+    HTML の再生成を省く（指紋は出力ファイルごと）。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.items = {}
+        self.page_fingerprints = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self):
+        """ファイルを1度だけ読み込む。取得スレッドから同時に呼ばれても読み終えるまで待たせる"""
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self.items = data.get("items", {})
+            self.page_fingerprints = data.get("page_fingerprints", {})
+            self.loaded = True
+
+    def save(self):
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=ITEM_STORE_MAX_AGE_DAYS)).isoformat()
+        self.items = {key: stored for key, stored in self.items.items()
+                      if stored.get("last_seen", "") >= cutoff}
+        data = {"page_fingerprints": self.page_fingerprints, "items": self.items}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(item):
+        if item.get("link"):
+            return canonical_link(item["link"])
+        return f"{item['source_key']}:{item['title']}"
+
+    def get(self, link):
+        """リンクに対応する保存済みアイテム（JSON 形式のまま）。なければ None"""
+        self.load()
+        return self.items.get(canonical_link(link)) if link else None
+
+    def apply(self, items):
+        """前回と同じ内容のアイテムに保存済みの翻訳と初出時刻（相対表記の日時も）を戻す
+
+        新しいか内容が変わったアイテムのリストを返す。
+        """
+        self.load()
+        now = datetime.now(timezone.utc).isoformat()
+        changed = []
+        for item in items:
+            stored = self.items.get(self.key(item))
+            item["first_seen"] = stored.get("first_seen", now) if stored else now
+            # 「3日前」から逆算した日時は取得のたびにずれるので、初めて見たときの日時に揃える
+            if item.get("relative_date") and stored and stored.get("date"):
+                item["date"] = datetime.fromisoformat(stored["date"])
+                item["time_ago"] = time_ago(item["date"])
+            unchanged = stored and stored.get("content_hash") == content_hash(item["title"], item["summary"])
+            # 英語なのに訳がないものは前回の翻訳が失敗したので、もう一度訳す
+            if unchanged and item.get("original_lang") == "en" and not stored.get("title_ja"):
+                unchanged = False
+            if unchanged:
+                for field in TRANSLATED_FIELDS:
+                    if field in stored:
+                        item[field] = stored[field]
+            else:
+                changed.append(item)
+        return changed
+
+    def update(self, items):
+        """今回のアイテムを翻訳込みで保存する"""
+        now = datetime.now(timezone.utc).isoformat()
+        for item in items:
+            data = item_to_json(item)
+            data["content_hash"] = content_hash(item["title"], item["summary"])
+            data["last_seen"] = now
+            self.items[self.key(item)] = data
+
+
+ITEM_STORE = ItemStore(os.path.join(CACHE_DIR, "items.json"))
+
+
+def page_fingerprint(all_items, reader=None, first_cards=None):
+    """ページの内容を表す指紋（経過時間や取得時刻の表示は含めない）
+
+    first_cards は分割出力の設定（--shards）で、変えるとページの形が変わるので指紋に含める。
+    """
+    parts = [json.dumps([reader, first_cards, get_seasonal_message()], ensure_ascii=False)]
+    for item in all_items:
+        parts.append(json.dumps([
+            item.get("source"), item["link"], item["title"], item["summary"],
+            item["image"], item["date"].isoformat() if item.get("date") else None,
+            item.get("title_ja"), item.get("summary_ja"),
+            (item.get("thumb") or {}).get("src"), bool(item.get("stale")),
+        ], ensure_ascii=False))
+    return content_hash(*parts)
+
+
+# ===================== 取得スケジュール =====================
+
+POLL_MINUTES = (60, 12 * 60)   # 取得間隔の下限と上限（分）。ソースの "poll_minutes" で上書きできる
+POLL_SLACK_MINUTES = 10        # cron の起動が遅れても1回分飛ばさないための余裕（分）
+POLL_SEEN_MAX = 50             # 新着の判定用に覚えておくアイテム数
+
+
+class SourceSchedule:
+    """ソースごとの取得間隔を、新着が出る間隔から学習して決める
+
+    新着を見つけた間隔の移動平均（cadence）と、最後の新着からの経過時間の長い方の
+    半分を次の取得間隔にし、poll_minutes の範囲に収める。頻繁に更新されるソースは
+    毎回取得し、めったに更新されないソースは上限まで間隔が伸びる。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sources = None
+
+    def load(self):
+        if self.sources is not None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def save(self):
+        if self.sources is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.sources, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def due(self, source_key, now=None):
+        """今回取得すべきか（記録のないソースは取得する）"""
+        self.load()
+        state = self.sources.get(source_key)
+        if not state or not state.get("next_due"):
+            return True
+        now = now or datetime.now(timezone.utc)
+        return now >= datetime.fromisoformat(state["next_due"]) - timedelta(minutes=POLL_SLACK_MINUTES)
+
+    def update(self, source_key, source, items, now=None):
+        """取得結果を記録して次の取得時刻を決める。新着があれば True を返す"""
+        self.load()
+        now = now or datetime.now(timezone.utc)
+        stamp = now.isoformat(timespec="seconds")
+        state = self.sources.setdefault(source_key, {"first_checked": stamp})
+        seen = [content_hash(ItemStore.key(item))[:12] for item in items]
+        new = bool(set(seen) - set(state.get("seen", [])))
+        if new:
+            if state.get("last_new"):
+                gap = (now - datetime.fromisoformat(state["last_new"])).total_seconds() / 60
+                cadence = state.get("cadence_minutes")
+                state["cadence_minutes"] = round(gap if cadence is None else (cadence + gap) / 2, 1)
+            state["last_new"] = stamp
+        since = datetime.fromisoformat(state.get("last_new") or state["first_checked"])
+        quiet = (now - since).total_seconds() / 60
+        low, high = source.get("poll_minutes", POLL_MINUTES)
+        interval = min(high, max(low, max(state.get("cadence_minutes") or 0, quiet) / 2))
+        state.update(
+            seen=list(dict.fromkeys(seen + state.get("seen", [])))[:POLL_SEEN_MAX],
+            last_checked=stamp,
+            interval_minutes=round(interval),
+            next_due=(now + timedelta(minutes=interval)).isoformat(timespec="seconds"),
+        )
+        return new
+
+    def describe(self, source_key):
+        """計測に残す、そのソースの今の間隔と次の取得時刻"""
+        self.load()
+        state = self.sources.get(source_key, {})
+        return {"interval_minutes": state.get("interval_minutes"), "next_due": state.get("next_due"),
+                "last_new": state.get("last_new")}
+
+
+SCHEDULE = SourceSchedule(os.path.join(CACHE_DIR, "schedule.json"))
+
+
+# ===================== ソースの健全性 =====================
+
+HEALTH_FAILURES_TO_OPEN = 2           # 続けてこの回数失敗したら取得を休止する
+HEALTH_COOLDOWN_MINUTES = 60          # 休止時間の初期値。休止明けにまた失敗するたびに倍にする
+HEALTH_COOLDOWN_MAX_MINUTES = 24 * 60
+
+
+class SourceHealth:
+    """ソースごとの取得の成否を覚え、失敗が続くソースを一定時間取得しない（サーキットブレーカー）
+
+    エラーや締め切り超過が HEALTH_FAILURES_TO_OPEN 回続いたソースは、休止時間が明けるまで
+    取得せずにすぐ前回分に切り替える。明けたら1回だけ試し、また失敗すれば休止時間を倍に
+    延ばす。1回でも成功すれば元に戻る。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.sources = None
+
+    def load(self):
+        if self.sources is not None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.sources = json.load(f)
+        except (OSError, ValueError):
+            self.sources = {}
+
+    def save(self):
+        if self.sources is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.sources, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def open_until(self, source_key, now=None):
+        """休止中ならその終わりの時刻、そうでなければ None"""
+        self.load()
+        until = self.sources.get(source_key, {}).get("open_until")
+        if until and (now or datetime.now(timezone.utc)) < datetime.fromisoformat(until):
+            return datetime.fromisoformat(until)
+        return None
+
+    def record(self, source_key, ok, error=None, now=None):
+        """取得の結果を記録する。休止に入ったらその分数を返す"""
+        self.load()
+        now = now or datetime.now(timezone.utc)
+        stamp = now.isoformat(timespec="seconds")
+        state = self.sources.setdefault(source_key, {"failures": 0})
+        if ok:
+            state.update(failures=0, open_until=None, last_ok=stamp)
+            return None
+        state["failures"] += 1
+        state["last_failure"] = stamp
+        state["last_error"] = str(error)[:200]
+        if state["failures"] < HEALTH_FAILURES_TO_OPEN:
+            return None
+        minutes = min(HEALTH_COOLDOWN_MAX_MINUTES,
+                      HEALTH_COOLDOWN_MINUTES * 2 ** (state["failures"] - HEALTH_FAILURES_TO_OPEN))
+        state["open_until"] = (now + timedelta(minutes=minutes)).isoformat(timespec="seconds")
+        return minutes
+
+
+HEALTH = SourceHealth(os.path.join(CACHE_DIR, "health.json"))
+
+
+# ===================== データ取得 =====================
+
+# ソースの type → 取得関数 (source_key, source) -> アイテムのリスト
+# 取得関数が使う重い依存（feedparser, bs4）は関数の中で lazy_import() する
+FETCHERS = {}
+
+
+def fetcher(source_type):
+    """取得関数を FETCHERS に登録するデコレーター"""
+    def register(func):
+        FETCHERS[source_type] = func
+        return func
+    return register
+
+
+FEED_MAX_ENTRIES = 10        # 1フィードで見るエントリ数
+UNTITLED = "（タイトルなし）"  # タイトルのないエントリに付ける仮のタイトル
+FEED_KEEP_ITEMS = 5          # 1フィードから残すアイテム数
+FEED_CHUNK_BYTES = 16 * 1024
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def feed_time(text):
+    """RSS（RFC 822）と Atom（ISO 8601）の日時を UTC の struct_time にする"""
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        when = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.utctimetuple()
+
+
+def element_html(elem):
+    """要素の中身を文字列で（Atom の type="xhtml" は子要素ごと）"""
+    if elem.get("type") == "xhtml" and len(elem):
+        return "".join(ElementTree.tostring(child, encoding="unicode") for child in elem).strip()
+    return (elem.text or "").strip()
+
+
+def entry_from_element(elem):
+    """<item> / <entry> 要素を、fetch_rss が読む feedparser のエントリと同じ形の dict にする"""
+    entry = {}
+    for child in elem.iter():
+        tag = child.tag
+        if tag in ("title", ATOM_NS + "title"):
+            entry.setdefault("title", (child.text or "").strip())
+        elif tag == "link":
+            entry.setdefault("link", (child.text or "").strip())
+        elif tag == ATOM_NS + "link" and child.get("rel", "alternate") == "alternate":
+            entry.setdefault("link", child.get("href", ""))
+        elif tag in ("description", ATOM_NS + "summary", MEDIA_NS + "description"):
+            entry.setdefault("summary", element_html(child))
+        elif tag in (CONTENT_NS + "encoded", ATOM_NS + "content"):
+            entry.setdefault("content", [{"value": element_html(child)}])
+        elif tag in ("pubDate", ATOM_NS + "published", DC_NS + "date"):
+            entry.setdefault("published_parsed", feed_time(child.text))
+        elif tag == ATOM_NS + "updated":
+            entry.setdefault("updated_parsed", feed_time(child.text))
+        elif tag == "enclosure":
+            entry.setdefault("enclosures", []).append(
+                {"href": child.get("url", ""), "type": child.get("type", "")})
+        elif tag == MEDIA_NS + "thumbnail":
+            entry.setdefault("media_thumbnail", []).append({"url": child.get("url", "")})
+        elif tag == MEDIA_NS + "content":
+            entry.setdefault("media_content", []).append(dict(child.attrib))
+    return entry
+
+
+class FeedStream:
+    """フィードを少しずつ読みながらエントリを1件ずつ返す
+
+    XMLPullParser で読めたエントリから順に渡し、渡し終えた要素は捨てる。
+    呼び出し側が必要な件数で止めれば、残りの本文はダウンロードもパースもしない。
+    XMLとして壊れているフィードは、残りを読み切ってから feedparser で読み直す。
+    読み直してもエントリが1件もなければ（HTML のページなど）フィードではないとして例外を投げる。
+    """
+
+    ROOT_TAGS = ("rss", "feed", "RDF")
+    ENTRY_TAGS = ("item", "entry")
+
+    def __init__(self, chunks, headers=None):
+        self.chunks = iter(chunks)
+        self.headers = dict(headers or {})
+        self.body = bytearray()
+        self.complete = False     # 本文を最後まで読んだか
+        self.fallback = False     # feedparser で読み直したか
+
+    def __iter__(self):
+        parser = ElementTree.XMLPullParser(events=("start", "end"))
+        stack = []
+        yielded = 0
+        try:
+            for chunk in self.chunks:
+                self.body += chunk
+                parser.feed(chunk)
+                for event, elem in parser.read_events():
+                    if event == "start":
+                        if not stack and local_name(elem.tag) not in self.ROOT_TAGS:
+                            raise ElementTree.ParseError(f"フィードではありません: <{elem.tag}>")
+                        stack.append(elem)
                         continue
-                    pub_date = parse_youtube_time(published)
-                    if pub_date and max_age:
-                        age_days = (datetime.now(timezone.utc) - pub_date).days
-                        if age_days > max_age:
-                            continue
-
-                    items.append({
-                        "source_key": source_key,
-                        "title": title,
-                        "summary": f"📺 {channel}" if channel else "",
-                        "link": f"https://www.youtube.com/watch?v={vid}",
-                        "date": pub_date,
-                        "time_ago": time_ago(pub_date) if pub_date else published,
-                        "image": thumb_url,
-                        "original_lang": "ja",
-                    })
-                    if len(items) >= 5:
-                        break
-                if len(items) >= 5:
-                    break
-        except (KeyError, IndexError) as e:
-            print(f"  ⚠️ YouTube検索のパースに失敗: {e}")
+                    stack.pop()
+                    if local_name(elem.tag) in self.ENTRY_TAGS:
+                        entry = entry_from_element(elem)
+                        if stack:
+                            stack[-1].remove(elem)
+                        yielded += 1
+                        yield entry
+            parser.close()
+            self.complete = True
+        except ElementTree.ParseError:
+            for chunk in self.chunks:
+                self.body += chunk
+            self.complete = True
+            self.fallback = True
+            feedparser = lazy_import("feedparser")
+            feed = feedparser.parse(bytes(self.body), response_headers=self.headers)
+            if not feed.entries and not yielded:
+                reason = feed.get("bozo_exception") or "エントリがありません"
+                raise ValueError(f"フィードとして読めません（{reason}）")
+            yield from feed.entries[yielded:]
+
+
+@fetcher("rss")
+def fetch_rss(source_key, source):
+    """RSSフィードからアイテムを取得
 
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
+    本文はストリーミングで読み、残すアイテムが揃った時点で読むのをやめる。
+    取得に失敗したら例外をそのまま投げる（前回分に切り替えるのは呼び出し側）。
+    """
+    max_age = source.get("max_age_days")
+    print(f"  📡 RSS取得中: {source['name']} ({source['platform']})...")
+    started = time.monotonic()
+    resp, cached_items = conditional_get(source_key, source["url"], stream=True)
+    if cached_items is not None:
+        print(f"  ♻️ 更新なし: {len(cached_items)}件（前回分）")
+        return cached_items
+    try:
+        resp.raise_for_status()
+        stream = FeedStream(resp.iter_content(FEED_CHUNK_BYTES), resp.headers)
+        items = rss_items(source_key, stream, max_age)
+    finally:
+        resp.close()
+        if not getattr(resp, "from_cache", False):  # 304 は conditional_get が記録済み
+            METRICS.add_http(source["url"], resp.status_code, response_bytes(resp),
+                             time.monotonic() - started)
+    finish_streamed_get(source["url"], resp, stream.body, not stream.complete)
+    HTTP_CACHE.store_items(source_key, items)
+    note = "（feedparser で再解析）" if stream.fallback else ""
+    print(f"  ✅ {len(items)}件取得{note}")
     return items
 
 
-def scrape_every():
-    """Every.toのトップページから記事を取得"""
+def rss_items(source_key, entries, max_age=None):
+    """フィードのエントリ列からアイテムを作る（必要な件数が揃えばそれ以上読まない）"""
     items = []
-    seen_titles = set()
-    skip_words = ["subscribe", "sign up", "log in", "newsletter", "cookie",
-                  "introducing every", "pricing", "about", "advertise",
-                  "view all", "read more", "careers", "contact"]
-    try:
-        print(f"  🌐 スクレイピング中: Every...")
-        resp = requests.get("https://every.to", headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
+    for entry in itertools.islice(entries, FEED_MAX_ENTRIES):
+        title = entry.get("title", UNTITLED)
+        link = entry.get("link", "")
+        raw_summary = entry.get("summary", entry.get("description", ""))
+        pub_date = parse_date(entry)
+
+        if max_age and pub_date:
+            age_days = (datetime.now(timezone.utc) - pub_date).days
+            if age_days > max_age:
+                continue
 
-        candidates = []
-        for heading in soup.find_all(["h1", "h2", "h3"]):
-            a_tag = heading.find("a", href=True)
-            if a_tag:
-                candidates.append(a_tag)
+        # 前回と同じエントリなら整形済みのサマリーと画像を使い回す
+        raw_hash = content_hash(title, raw_summary, entry_content(entry))
+        stored = ITEM_STORE.get(link)
+        if stored and stored.get("raw_hash") == raw_hash:
+            summary, image = stored["summary"], stored["image"]
+        else:
+            summary, image = summarize_entry(entry)
 
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            if re.match(r"^/[a-z-]+/[a-z0-9-]+", href) and len(href) > 15:
-                candidates.append(a_tag)
+        # YouTube動画の場合、サムネイルを生成
+        if not image and "youtube.com" in link:
+            vid_match = re.search(r'v=([^&]+)', link)
+            if vid_match:
+                image = f"https://i.ytimg.com/vi/{vid_match.group(1)}/mqdefault.jpg"
 
-        for a_tag in candidates:
-            href = a_tag.get("href", "")
-            if not href or href.startswith("#"):
-                continue
-            title_text = ""
-            for child in a_tag.descendants:
-                if isinstance(child, str):
-                    title_text += child
-            title_text = title_text.strip()
-            title_text = re.sub(r'(?<=[A-Z])\s+(?=[a-z])', '', title_text)
-            title_text = re.sub(r'\s+', ' ', title_text).strip()
-
-            if not title_text or len(title_text) < 10 or len(title_text) > 200:
-                continue
-            if any(sw in title_text.lower() for sw in skip_words):
-                continue
-            title_lower = title_text.lower()
-            if title_lower in seen_titles:
+        items.append({
+            "source_key": source_key,
+            "title": title,
+            "summary": summary,
+            "link": link,
+            "date": pub_date,
+            "time_ago": time_ago(pub_date),
+            "image": image,
+            "original_lang": "en" if is_english(title) else "ja",
+            "raw_hash": raw_hash,
+        })
+        if len(items) >= FEED_KEEP_ITEMS:
+            break
+    return items
+
+
+YOUTUBE_MAX_BYTES = 4 * 1024 * 1024   # 検索結果ページから読み込む上限
+YOUTUBE_SEARCH_URL = "https://www.youtube.com/results?search_query={query}&sp=CAI%3D"   # 新しい順
+YT_INITIAL_DATA_RE = re.compile(r'ytInitialData"?\]?\s*=\s*\{')
+VIDEO_RENDERER_RE = re.compile(r'"videoRenderer"\s*:\s*\{')
+
+
+def iter_video_renderers(chunks, max_bytes=YOUTUBE_MAX_BYTES):
+    """検索結果ページを読み進めながら ytInitialData 内の videoRenderer を順に返す
+
+    ytInitialData 全体は decode せず、videoRenderer のオブジェクトだけを
+    raw_decode で1つずつ取り出す。手元に残すのは読みかけの部分だけで、
+    呼び出し側が必要な件数で止めればそれ以降は読み込まない。
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = iter(chunks)
+    buf = ""
+    size = 0
+    started = False
+    eof = False
+    while not eof:
+        chunk = next(chunks, None)
+        if chunk is None or size >= max_bytes:
+            eof = True
+            buf += utf8.decode(b"", final=True)
+        else:
+            size += len(chunk)
+            buf += utf8.decode(chunk)
+
+        if not started:
+            match = YT_INITIAL_DATA_RE.search(buf)
+            if not match:
+                buf = buf[-64:]   # チャンクの境目で分かれた目印を拾えるよう末尾だけ残す
                 continue
-            seen_titles.add(title_lower)
+            started = True
+            buf = buf[match.end():]
+
+        while True:
+            match = VIDEO_RENDERER_RE.search(buf)
+            script_end = buf.find("</script>")
+            if script_end != -1 and (match is None or script_end < match.start()):
+                return
+            if match is None:
+                buf = buf[-64:]
+                break
+            try:
+                renderer, end = decoder.raw_decode(buf, match.end() - 1)
+            except ValueError:
+                if eof:
+                    buf = buf[match.end():]
+                    continue
+                buf = buf[match.start():]   # 途中までしか届いていないので続きを待つ
+                break
+            yield renderer
+            buf = buf[end:]
 
-            # 近くの画像を探す
-            image = ""
-            parent = a_tag.parent
-            for _ in range(5):
-                if parent is None:
-                    break
-                img = parent.find("img", src=True)
-                if img and not img["src"].startswith("data:"):
-                    image = img["src"]
-                    break
-                parent = parent.parent
 
-            full_url = href if href.startswith("http") else f"https://every.to{href}"
+@fetcher("youtube_search")
+def search_youtube(source_key, source):
+    """YouTube検索で動画を取得（検索結果ページから動画が見つからなければ失敗とする）"""
+    items = []
+    query = source.get("query", "")
+    max_age = source.get("max_age_days", 90)
+    print(f"  🔍 YouTube検索中: {query}...")
+    url = YOUTUBE_SEARCH_URL.format(query=quote(query))
+    started = time.monotonic()
+    resp = http_get(url, stream=True)
+    found = 0
+    try:
+        resp.raise_for_status()
+        for vr in iter_video_renderers(resp.iter_content(64 * 1024)):
+            found += 1
+            vid = vr.get('videoId', '')
+            title = (vr.get('title', {}).get('runs') or [{}])[0].get('text', '')
+            channel = (vr.get('ownerText', {}).get('runs') or [{}])[0].get('text', '')
+            published = vr.get('publishedTimeText', {}).get('simpleText', '')
+            # サムネイル取得
+            thumbs = vr.get('thumbnail', {}).get('thumbnails', [])
+            thumb_url = thumbs[-1].get('url', '') if thumbs else ''
+            if not thumb_url and vid:
+                thumb_url = f"https://i.ytimg.com/vi/{vid}/mqdefault.jpg"
+
+            if not title or not vid:
+                continue
+            pub_date = parse_youtube_time(published)
+            if pub_date and max_age:
+                age_days = (datetime.now(timezone.utc) - pub_date).days
+                if age_days > max_age:
+                    continue
+
             items.append({
-                "source_key": "every",
-                "title": title_text,
-                "summary": "",
-                "link": full_url,
-                "date": None,
-                "time_ago": "最近",
-                "image": image,
-                "original_lang": "en",
+                "source_key": source_key,
+                "title": title,
+                "summary": f"📺 {channel}" if channel else "",
+                "link": f"https://www.youtube.com/watch?v={vid}",
+                "date": pub_date,
+                "time_ago": time_ago(pub_date) if pub_date else published,
+                "image": thumb_url,
+                "original_lang": "ja",
+                "relative_date": pub_date is not None,   # 「3日前」から逆算した日時
             })
             if len(items) >= 5:
                 break
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
+    finally:
+        resp.close()
+        METRICS.add_http(url, resp.status_code, response_bytes(resp), time.monotonic() - started)
+
+    if not found:
+        raise ValueError("YouTube検索データが取得できませんでした")
+    HTTP_CACHE.store_items(source_key, items)
+    print(f"  ✅ {len(items)}件取得")
     return items
 
 
 def scrape_moltbook():
-    """Moltbookのコンテンツを取得"""
-    items = []
+    """Moltbook の紹介アイテム（ベータ版で投稿がまだ少ないので、ページは取得しない）"""
+    print("  📌 Moltbook: 紹介を表示")
+    items = [{
+        "source_key": "moltbook",
+        "title": "Moltbook — AIエージェントのソーシャルネットワーク（ベータ版）",
+        "summary": "AIエージェント同士が交流する新しいプラットフォーム。ベータ版のため投稿はまだ少なめです。",
+        "link": "https://www.moltbook.com",
+        "date": None,
+        "time_ago": "",
+        "image": "",
+        "original_lang": "ja",
+    }]
+    HTTP_CACHE.store_items("moltbook", items)
+    return items
+
+
+# ===================== スクレイピング =====================
+
+# SOURCES の "scrape" に書ける設定と既定値
+SCRAPE_DEFAULTS = {
+    "parse_only": None,          # この要素の中だけをパースする（None なら全体。lxml では絞ると遅くなる）
+    "heading_links": False,      # h1〜h3 内の最初のリンクを優先して候補にする
+    "link_pattern": None,        # 候補にするリンクの href（re.search）。None なら全リンク
+    "min_href_len": 0,           # link_pattern で拾う href の最小の長さ
+    "title_from": "text",        # "text": get_text(strip=True) / "descendants": 文字列をそのまま連結
+    "min_title_len": 10,
+    "max_title_len": 300,
+    "skip_words": [],            # タイトルにこれらを含むリンクは除外（小文字で比較）
+    "dedupe_titles": False,      # 同じタイトルのリンクを1件にまとめる
+    "image_levels": 5,           # 画像を探すときに遡る親要素の段数
+    "limit": 5,
+    "time_ago": "",
+    "original_lang": "en",
+}
+
+
+def make_soup(markup, parse_only=None):
+    """速いパーサー（lxml）でパースする。入っていなければ html.parser を使う
+
+    parse_only を指定すると該当要素の中だけを組み立てる。何も残らなかったときは
+    全体をパースし直す（html.parser は省略された <body> を補わないため）。
+    """
+    bs4 = lazy_import("bs4")
+    strainer = bs4.SoupStrainer(parse_only) if parse_only else None
     try:
-        print(f"  🌐 スクレイピング中: Moltbook...")
-        requests.get("https://www.moltbook.com", headers=HEADERS, timeout=15)
+        soup = bs4.BeautifulSoup(markup, "lxml", parse_only=strainer)
+    except bs4.FeatureNotFound:
+        soup = bs4.BeautifulSoup(markup, "html.parser", parse_only=strainer)
+    if strainer is not None and soup.find() is None:
+        return make_soup(markup)
+    return soup
+
+
+def link_title(a_tag, title_from):
+    if title_from == "descendants":
+        # Every は <span> の区切りで "A tlas" のような空白が入るので詰める
+        title_text = "".join(child for child in a_tag.descendants if isinstance(child, str)).strip()
+        title_text = re.sub(r'(?<=[A-Z])\s+(?=[a-z])', '', title_text)
+        return re.sub(r'\s+', ' ', title_text).strip()
+    return a_tag.get_text(strip=True)
+
+
+def extract_links(markup, source_key, base_url, rules):
+    """設定に従ってページから記事リンクを取り出し、アイテムのリストを返す"""
+    rules = {**SCRAPE_DEFAULTS, **rules}
+    soup = make_soup(markup, rules["parse_only"])
+    images = ImageIndex(soup, base_url)
+
+    candidates = []
+    if rules["heading_links"]:
+        for heading in soup.find_all(["h1", "h2", "h3"]):
+            a_tag = heading.find("a", href=True)
+            if a_tag:
+                candidates.append(a_tag)
+    pattern = re.compile(rules["link_pattern"]) if rules["link_pattern"] else None
+    for a_tag in soup.find_all("a", href=True):
+        href = a_tag["href"]
+        if pattern is None or (pattern.search(href) and len(href) >= rules["min_href_len"]):
+            candidates.append(a_tag)
+
+    items = []
+    seen_titles = set()
+    seen_links = set()
+    for a_tag in candidates:
+        href = a_tag.get("href", "")
+        if not href or href.startswith("#"):
+            continue
+        link = href if href.startswith("http") else urljoin(base_url, href)
+        if canonical_link(link) in seen_links:
+            continue
+        title_text = link_title(a_tag, rules["title_from"])
+        if not title_text or not rules["min_title_len"] <= len(title_text) <= rules["max_title_len"]:
+            continue
+        title_lower = title_text.lower()
+        if any(sw in title_lower for sw in rules["skip_words"]):
+            continue
+        if rules["dedupe_titles"]:
+            if title_lower in seen_titles:
+                continue
+            seen_titles.add(title_lower)
+        seen_links.add(canonical_link(link))
+
         items.append({
-            "source_key": "moltbook",
-            "title": "Moltbook — AIエージェントのソーシャルネットワーク（ベータ版）",
-            "summary": "AIエージェント同士が交流する新しいプラットフォーム。ベータ版のため投稿はまだ少なめです。",
-            "link": "https://www.moltbook.com",
+            "source_key": source_key,
+            "title": title_text,
+            "summary": "",
+            "link": link,
             "date": None,
-            "time_ago": "",
-            "image": "",
-            "original_lang": "ja",
+            "time_ago": rules["time_ago"],
+            "image": images.nearest(a_tag, max_levels=rules["image_levels"]),
+            "original_lang": rules["original_lang"],
         })
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
+        if len(items) >= rules["limit"]:
+            break
     return items
 
 
-def scrape_amodei():
-    """Dario Amodeiの個人ブログから記事を取得"""
-    items = []
-    try:
-        print(f"  🌐 スクレイピング中: Dario Amodei...")
-        resp = requests.get("https://darioamodei.com", headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
+def scrape_source(source_key, source):
+    """SOURCES の "scrape" 設定に従ってWebページから記事を取得"""
+    print(f"  🌐 スクレイピング中: {source['name']} ({source['platform']})...")
+    resp, cached_items = conditional_get(source_key, source["url"])
+    if cached_items is not None:
+        print(f"  ♻️ 更新なし: {len(cached_items)}件（前回分）")
+        return cached_items
+    resp.raise_for_status()
+    items = extract_links(resp.text, source_key, source["url"], source["scrape"])
+    if not items:
+        raise ValueError("記事のリンクが見つかりませんでした")
+    HTTP_CACHE.store_items(source_key, items)
+    print(f"  ✅ {len(items)}件取得")
+    return items
 
-        # ブログのリンクを探す
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            title_text = a_tag.get_text(strip=True)
 
-            if not title_text or len(title_text) < 10 or len(title_text) > 300:
-                continue
+# "scrape" 設定では表せない個別のスクレイパー
+SCRAPERS = {
+    "moltbook": scrape_moltbook,
+}
 
-            skip = ["home", "about", "contact", "subscribe", "menu", "navigation",
-                    "dario amodei", "privacy", "terms"]
-            if any(sw in title_text.lower() for sw in skip):
-                continue
 
-            full_url = href if href.startswith("http") else f"https://darioamodei.com{href}"
+@fetcher("scrape")
+def fetch_scraped(source_key, source):
+    """ソースの scrape 設定に従ってスクレイピングする。設定がなければ個別のスクレイパーを使う"""
+    if "scrape" in source:
+        return scrape_source(source_key, source)
+    if source_key in SCRAPERS:
+        return SCRAPERS[source_key]()
+    print(f"  ⚠️ スクレイピング設定がありません: {source_key}")
+    return []
 
-            # 画像を探す
-            image = ""
-            parent = a_tag.parent
-            for _ in range(4):
-                if parent is None:
-                    break
-                img = parent.find("img", src=True)
-                if img and not img["src"].startswith("data:"):
-                    img_src = img["src"]
-                    if not img_src.startswith("http"):
-                        img_src = f"https://darioamodei.com{img_src}"
-                    image = img_src
-                    break
-                parent = parent.parent
 
-            items.append({
-                "source_key": "amodei",
-                "title": title_text,
-                "summary": "",
-                "link": full_url,
-                "date": None,
-                "time_ago": "",
-                "image": image,
-                "original_lang": "en",
-            })
-            if len(items) >= 5:
-                break
+# ===================== 重複の除去 =====================
 
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
-    return items
+TITLE_SHINGLE = 3         # タイトルを比べる単位（文字数）
+TITLE_MIN_CHARS = 12      # これより短いタイトルは完全に一致したときだけ重複とみなす
+TITLE_SIMILARITY = 0.8    # シングルの Jaccard 係数がこれ以上なら同じ記事
+MINHASH_PERMS = 32        # MinHash の署名の長さ（16ビットの値を 32 個）
+MINHASH_BANDS = 8         # 署名を 4 個ずつの帯に分け、どれか1つの帯が一致したものだけを比べる
 
 
-def scrape_tedchiang():
-    """Ted ChiangのNew Yorker記事を取得"""
-    items = []
-    try:
-        print(f"  🌐 スクレイピング中: Ted Chiang (The New Yorker)...")
-        resp = requests.get("https://www.newyorker.com/contributors/ted-chiang",
-                          headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        for a_tag in soup.find_all("a", href=True):
-            href = a_tag["href"]
-            # 記事リンクのパターン
-            if not re.search(r'/(magazine|culture|tech|news|science)/', href):
-                continue
+def normalize_title(title):
+    """比較用のタイトル（NFKC、小文字、文字と数字だけ）"""
+    return "".join(ch for ch in unicodedata.normalize("NFKC", title or "").lower() if ch.isalnum())
 
-            title_text = a_tag.get_text(strip=True)
-            if not title_text or len(title_text) < 10 or len(title_text) > 300:
-                continue
 
-            skip = ["subscribe", "sign in", "newsletter", "new yorker", "podcast",
-                    "cartoon", "crossword", "goings on"]
-            if any(sw in title_text.lower() for sw in skip):
-                continue
+def similar_titles(numbers, shingles, other_numbers, other_shingles):
+    """ほぼ同じタイトルか。回や号の番号が違うものは別の記事とみなす"""
+    if numbers != other_numbers:
+        return False
+    return len(shingles & other_shingles) / len(shingles | other_shingles) >= TITLE_SIMILARITY
 
-            full_url = href if href.startswith("http") else f"https://www.newyorker.com{href}"
 
-            # 画像
-            image = ""
-            parent = a_tag.parent
-            for _ in range(5):
-                if parent is None:
-                    break
-                img = parent.find("img", src=True)
-                if img and not img["src"].startswith("data:"):
-                    image = img["src"]
-                    break
-                parent = parent.parent
+def title_shingles(text):
+    if len(text) <= TITLE_SHINGLE:
+        return {text}
+    return {text[i:i + TITLE_SHINGLE] for i in range(len(text) - TITLE_SHINGLE + 1)}
 
-            items.append({
-                "source_key": "tedchiang",
-                "title": title_text,
-                "summary": "",
-                "link": full_url,
-                "date": None,
-                "time_ago": "",
-                "image": image,
-                "original_lang": "en",
-            })
-            if len(items) >= 5:
-                break
 
-        print(f"  ✅ {len(items)}件取得")
-    except Exception as e:
-        print(f"  ❌ エラー: {e}")
-    return items
+def minhash(shingles):
+    """シングルの集合の MinHash 署名（1回のハッシュを MINHASH_PERMS 個の値に切り分けて使う）"""
+    layout = f"<{MINHASH_PERMS}H"
+    values = [struct.unpack(layout, hashlib.blake2b(shingle.encode("utf-8"),
+                                                    digest_size=2 * MINHASH_PERMS).digest())
+              for shingle in shingles]
+    return [min(column) for column in zip(*values)]
+
+
+def merge_duplicate(item, duplicate):
+    """残すアイテムに欠けている画像と日時を重複の方から補う"""
+    if not item.get("image") and duplicate.get("image"):
+        item["image"] = duplicate["image"]
+    if not item.get("date") and duplicate.get("date"):
+        item["date"] = duplicate["date"]
+        item["time_ago"] = duplicate["time_ago"]
+
+
+def dedupe_items(items):
+    """リンクが同じか、タイトルがほぼ同じアイテムを1件にまとめる
+
+    (残したアイテム, [(重複, 残した方)]) を返す。先に現れたアイテム（SOURCES の順）を残す。
+    タイトルは MinHash の帯が1つでも一致したものだけを候補にし、シングルの
+    Jaccard 係数で確かめるので、件数が増えても全組み合わせは比べない。
+    短いタイトル（「Mailbag」のような連載名だけの回）と仮のタイトルは、
+    リンクが違えばタイトルが同じでも別の記事とみなす。
+    """
+    untitled = normalize_title(UNTITLED)
+    rows = MINHASH_PERMS // MINHASH_BANDS
+    kept = []
+    kept_titles = []   # kept と同じ並びの (タイトル中の数字, シングル)
+    duplicates = []
+    by_link = {}
+    by_title = {}  # 正規化したタイトル → (残したアイテム, そのリンク)
+    buckets = {}   # (帯の番号, 帯の値) → 残したアイテムの番号
+    for item in items:
+        link = canonical_link(item["link"]) if item.get("link") else None
+        title = normalize_title(item.get("title"))
+        original = by_link.get(link) if link else None
+        if original is None and title in by_title:
+            candidate, candidate_link = by_title[title]
+            generic = len(title) < TITLE_MIN_CHARS or title == untitled
+            if not (generic and link and candidate_link and link != candidate_link):
+                original = candidate
+        numbers, shingles, bands = None, None, []
+        if original is None and len(title) >= TITLE_MIN_CHARS:
+            numbers = re.findall(r"\d+", title)
+            shingles = title_shingles(title)
+            signature = minhash(shingles)
+            bands = [(band, tuple(signature[band * rows:(band + 1) * rows]))
+                     for band in range(MINHASH_BANDS)]
+            for index in sorted({i for band in bands for i in buckets.get(band, ())}):
+                if similar_titles(numbers, shingles, *kept_titles[index]):
+                    original = kept[index]
+                    break
+        if original is not None:
+            merge_duplicate(original, item)
+            duplicates.append((item, original))
+            continue
+        for band in bands:
+            buckets.setdefault(band, []).append(len(kept))
+        kept.append(item)
+        kept_titles.append((numbers, shingles))
+        if link:
+            by_link[link] = item
+        if title and title not in by_title:
+            by_title[title] = (item, link)
+    return kept, duplicates
 
 
 # ===================== 翻訳処理 =====================
 
-def translate_items(all_items):
-    """英語アイテムのタイトルとサマリーを日本語に翻訳"""
+def translate_items(all_items, batch_chars=TRANSLATE_BATCH_CHARS,
+                    workers=TRANSLATE_WORKERS, budget=TRANSLATE_BUDGET):
+    """英語アイテムのタイトルとサマリーを日本語に翻訳
+
+    全アイテムの文を translate_many でまとめて翻訳してから各アイテムに戻す。
+    持ち時間内に訳せなかったものは原文のまま残る。
+    """
     en_items = [i for i in all_items if i.get("original_lang") == "en"]
     if not en_items:
         return
 
     print(f"\n🌐 英語コンテンツ {len(en_items)}件を日本語に翻訳中...")
 
+    texts = []
+    for item in en_items:
+        texts.append(item["title"])
+        if item["summary"] and is_english(item["summary"]):
+            texts.append(item["summary"])
+    try:
+        translated = translate_many(texts, batch_chars, workers, budget)
+    finally:
+        TRANSLATION_CACHE.evict()
+
     for i, item in enumerate(en_items):
         original_title = item["title"]
-        translated_title = translate_to_japanese(original_title)
+        translated_title = translated.get(original_title, original_title)
         if translated_title != original_title:
             item["title_ja"] = translated_title
             item["title_en"] = original_title
@@ -670,17 +2348,370 @@ def translate_items(all_items):
             item["title_en"] = original_title
 
         if item["summary"] and is_english(item["summary"]):
-            item["summary_ja"] = translate_to_japanese(item["summary"])
+            item["summary_ja"] = translated.get(item["summary"], item["summary"])
         else:
             item["summary_ja"] = item["summary"]
 
-        time.sleep(0.3)
+    TRANSLATION_CACHE.report()
+    print("  ✅ 翻訳完了")
+
+
+# ===================== 画像 =====================
+
+IMAGE_DIR_NAME = "images"         # 出力HTMLと同じ場所に作る縮小画像の置き場所
+THUMB_SIZE = (1168, 400)          # カード画像の表示サイズ（584×200）の2倍
+THUMB_QUALITY = 75
+IMAGE_WORKERS = 6
+IMAGE_BUDGET = 30                 # 画像処理の持ち時間（秒）。間に合わなければ元のURLを使う
+IMAGE_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_RETRY_HOURS = 24            # 取得・変換に失敗した画像を再試行するまでの時間
+
+
+class ImageCache:
+    """元画像のURL → 縮小画像のファイル名 の対応表
+
+    縮小画像のファイル名は中身のハッシュなので、同じ画像は1つのファイルになる。
+    一度変換したURLは（ファイルが残っている限り）二度とダウンロードしない。
+    失敗したURLも覚えておき、IMAGE_RETRY_HOURS が過ぎるまでは取りにいかない。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, url, image_dir):
+        """(使える記録, 取りにいくべきか) を返す"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None, True
+        if entry.get("error"):
+            checked = datetime.fromisoformat(entry["checked_at"])
+            return None, datetime.now(timezone.utc) - checked > timedelta(hours=IMAGE_RETRY_HOURS)
+        if not os.path.exists(os.path.join(image_dir, entry["file"])):
+            return None, True
+        return entry, False
+
+    def add(self, url, entry):
+        with self.lock:
+            self.entries[url] = entry
+
+    def fail(self, url):
+        with self.lock:
+            self.entries[url] = {"error": True,
+                                 "checked_at": datetime.now(timezone.utc).isoformat()}
+
+    def prune(self, image_dir, used_urls):
+        """今回のページで使わない縮小画像を消す（対応表からも外す）"""
+        used_files = {self.entries[url]["file"] for url in used_urls
+                      if url in self.entries and "file" in self.entries[url]}
+        removed = 0
+        for name in os.listdir(image_dir):
+            if name not in used_files and not name.startswith("."):
+                os.unlink(os.path.join(image_dir, name))
+                removed += 1
+        self.entries = {url: entry for url, entry in self.entries.items()
+                        if entry.get("error") or entry["file"] in used_files}
+        return removed
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+IMAGE_CACHE = ImageCache(os.path.join(CACHE_DIR, "images.json"))
+
+
+def make_thumbnail(data):
+    """画像をカードの表示サイズに切り抜いて縮小し、(本文, 拡張子, 幅, 高さ) を返す
+
+    小さい画像は拡大せず、同じ縦横比で切り抜くだけにする。
+    Pillow が WebP を書けなければ JPEG にする。
+    """
+    Image = lazy_import("PIL.Image")
+    ImageOps = lazy_import("PIL.ImageOps")
+    features = lazy_import("PIL.features")
+    target_w, target_h = THUMB_SIZE
+    with Image.open(io.BytesIO(data)) as img:
+        img.draft("RGB", THUMB_SIZE)  # JPEG は縮小しながらデコードする
+        img = ImageOps.exif_transpose(img)
+        ratio = min(1.0, img.width / target_w, img.height / target_h)
+        size = (max(1, round(target_w * ratio)), max(1, round(target_h * ratio)))
+        thumb = ImageOps.fit(img, size, method=Image.LANCZOS)
+    out = io.BytesIO()
+    if features.check("webp"):
+        thumb = thumb.convert("RGBA" if thumb.mode in ("RGBA", "LA", "P") else "RGB")
+        thumb.save(out, "WEBP", quality=THUMB_QUALITY, method=4)
+        ext = "webp"
+    else:
+        thumb.convert("RGB").save(out, "JPEG", quality=THUMB_QUALITY, optimize=True,
+                                  progressive=True)
+        ext = "jpg"
+    return out.getvalue(), ext, thumb.width, thumb.height
+
+
+def download_thumbnail(url, image_dir):
+    """画像を取得して縮小版を image_dir に保存する。失敗したら None"""
+    try:
+        started = time.monotonic()
+        resp = http_get(url, timeout=10, stream=True)
+        data = bytearray()
+        try:
+            resp.raise_for_status()
+            for chunk in resp.iter_content(64 * 1024):
+                data += chunk
+                if len(data) > IMAGE_MAX_BYTES:
+                    raise ValueError(f"{IMAGE_MAX_BYTES // (1024 * 1024)}MB を超えています")
+        finally:
+            resp.close()
+            METRICS.add_http(url, resp.status_code, response_bytes(resp), time.monotonic() - started)
+        body, ext, width, height = make_thumbnail(bytes(data))
+    except Exception as e:
+        print(f"    ⚠️ 画像スキップ: {url[:60]} ({str(e)[:40]})")
+        return None
+    name = f"{hashlib.sha1(body).hexdigest()[:20]}.{ext}"
+    path = os.path.join(image_dir, name)
+    if not os.path.exists(path):
+        tmp_path = os.path.join(image_dir, f".{name}.tmp.{threading.get_ident()}")
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    return {"file": name, "width": width, "height": height, "bytes": len(body),
+            "original_bytes": len(data)}
+
+
+def localize_images(all_items, image_dir, workers=IMAGE_WORKERS, budget=IMAGE_BUDGET,
+                    prune=True):
+    """アイテムの画像を縮小版に差し替える（item["thumb"] に src / width / height を入れる）
+
+    変換済みのURLは取りにいかず、新しいURLだけを並列に取得・変換する。
+    Pillow がない、持ち時間を過ぎた、失敗した画像は元のURLのまま表示する。
+    持ち時間を過ぎた取得は DaemonPool のスレッドに残し、待たない。
+    """
+    os.makedirs(image_dir, exist_ok=True)
+    try:
+        lazy_import("PIL.Image")
+    except ImportError:
+        print("\n🖼️ Pillow がないため画像は元のURLのまま表示します")
+        return
+    urls = {item["image"] for item in all_items
+            if urlsplit(item.get("image") or "").scheme in ("http", "https")}
+    entries = {}
+    todo = []
+    for url in urls:
+        entry, fetch = IMAGE_CACHE.lookup(url, image_dir)
+        if entry:
+            entries[url] = entry
+        elif fetch:
+            todo.append(url)
+
+    if todo:
+        print(f"\n🖼️ 新しい画像 {len(todo)}件を縮小中（変換済み {len(entries)}件）...")
+        executor = DaemonPool(max(1, workers), thread_name_prefix="image")
+        futures = {executor.submit(download_thumbnail, url, image_dir): url for url in todo}
+        done, not_done = wait(futures, timeout=budget)
+        executor.shutdown()
+        saved = 0
+        for future in done:
+            url = futures[future]
+            entry = future.result()
+            if entry:
+                IMAGE_CACHE.add(url, entry)
+                entries[url] = entry
+                saved += entry["original_bytes"] - entry["bytes"]
+            else:
+                IMAGE_CACHE.fail(url)
+        if not_done:
+            print(f"  ⏰ 持ち時間切れ: {len(not_done)}件は元のURLのまま")
+        converted = sum(1 for future in done if futures[future] in entries)
+        print(f"  ✅ {converted}/{len(todo)}件を変換（{saved / 1024:.0f}KB 削減）")
+
+    prefix = os.path.basename(image_dir)
+    for item in all_items:
+        entry = entries.get(item.get("image"))
+        if entry:
+            item["thumb"] = {"src": f"{prefix}/{entry['file']}",
+                             "width": entry["width"], "height": entry["height"]}
+    if prune:
+        IMAGE_CACHE.prune(image_dir, entries)
+    IMAGE_CACHE.save()
+
+
+# ===================== フォント =====================
+
+FONT_SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts")
+FONT_OUTPUT_DIR_NAME = "webfonts"   # 出力HTMLと同じ場所に作るサブセットの置き場所
+
+FONT_DOWNLOAD_BASE = "https://github.com/google/fonts/raw/main/ofl/"   # どれも SIL OFL
+FONT_MAGIC = (b"\x00\x01\x00\x00", b"true", b"OTTO")   # TrueType / OpenType の先頭4バイト
+
+# fonts/ に置く元のフォント（--download-fonts で url から取得する）。ファイルがない書体は
+# Google Fonts から読み込む
+FONT_FACES = [
+    {"family": "Zen Maru Gothic", "weight": "400", "file": "ZenMaruGothic-Regular.ttf",
+     "url": FONT_DOWNLOAD_BASE + "zenmarugothic/ZenMaruGothic-Regular.ttf"},
+    {"family": "Zen Maru Gothic", "weight": "500", "file": "ZenMaruGothic-Medium.ttf",
+     "url": FONT_DOWNLOAD_BASE + "zenmarugothic/ZenMaruGothic-Medium.ttf"},
+    {"family": "Zen Maru Gothic", "weight": "700", "file": "ZenMaruGothic-Bold.ttf",
+     "url": FONT_DOWNLOAD_BASE + "zenmarugothic/ZenMaruGothic-Bold.ttf"},
+    {"family": "Noto Serif JP", "weight": "300 700", "file": "NotoSerifJP-VariableFont_wght.ttf",
+     "url": FONT_DOWNLOAD_BASE + "notoserifjp/NotoSerifJP%5Bwght%5D.ttf"},
+]
+GOOGLE_FONTS = {
+    "Noto Serif JP": "wght@300;400;500;600;700",
+    "Zen Maru Gothic": "wght@400;500;700",
+}
+
+# ページに出ていなくても常にサブセットに入れる文字（時刻や挨拶で入れ替わる文字）。
+# これがあるとページの中身が少し変わっただけでは文字集合が変わらず、サブセットを使い回せる
+FONT_BASE_TEXT = ("".join(chr(c) for c in range(0x20, 0x7F))
+                  + "年月日時分間前週ヶ火水木金土おはようこんにちばんわ、👋🏻")
+
+FONT_FACE_TEMPLATE = Template(
+    '            @font-face { font-family: "$family"; font-style: normal; font-weight: $weight;'
+    ' font-display: swap; src: url("$src") format("$format"); }\n'
+)
+
+
+GOOGLE_FONTS_LINKS_TEMPLATE = Template(
+    '        <link rel="preconnect" href="https://fonts.googleapis.com">\n'
+    '        <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>\n'
+    '        <link rel="stylesheet" href="$href" media="print" onload="this.media=\'all\'">\n'
+    '        <noscript><link rel="stylesheet" href="$href"></noscript>\n'
+)
+
+
+def google_fonts_links(families):
+    """Google Fonts から読み込む <link>（families が空なら空文字）
 
-    print(f"  ✅ 翻訳完了")
+    @import だと CSS を読み終えるまで描画が止まるので、media="print" で読み込んで
+    読み終えてから all に切り替える。それまでは代わりの書体で表示される。
+    """
+    if not families:
+        return ""
+    query = "&".join(f"family={family.replace(' ', '+')}:{GOOGLE_FONTS[family]}"
+                     for family in families)
+    return GOOGLE_FONTS_LINKS_TEMPLATE.substitute(
+        href=escape(f"https://fonts.googleapis.com/css2?{query}&display=swap"))
+
+
+def download_fonts():
+    """FONT_FACES の元のフォントのうち fonts/ にないものを取得し、取得できなかったファイル名を返す"""
+    os.makedirs(FONT_SOURCE_DIR, exist_ok=True)
+    missing = []
+    for face in FONT_FACES:
+        path = os.path.join(FONT_SOURCE_DIR, face["file"])
+        if os.path.exists(path):
+            continue
+        try:
+            resp = http_get(face["url"], timeout=60)
+            resp.raise_for_status()
+            if resp.content[:4] not in FONT_MAGIC:
+                raise ValueError("フォントファイルではありません")
+        except Exception as e:
+            print(f"  ❌ {face['file']}: {e}")
+            missing.append(face["file"])
+            continue
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(resp.content)
+        os.replace(tmp_path, path)
+        print(f"  🔤 {face['file']} を取得しました（{len(resp.content) / 1024:.0f}KB）")
+    return missing
+
+
+def page_glyphs(chunks):
+    """ページに出てくる文字と FONT_BASE_TEXT を合わせた文字集合（並べた文字列）"""
+    glyphs = set(FONT_BASE_TEXT)
+    for chunk in chunks:
+        glyphs.update(chunk)
+    return "".join(sorted(c for c in glyphs if c >= " "))
+
+
+def subset_font(source_path, glyphs, flavor):
+    """フォントを glyphs の文字だけに絞り、flavor（woff2 / woff）の本文を返す"""
+    subset = lazy_import("fontTools.subset")
+    options = subset.Options()
+    options.flavor = flavor
+    options.desubroutinize = True
+    font = subset.load_font(source_path, options)
+    try:
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(text=glyphs)
+        subsetter.subset(font)
+        out = io.BytesIO()
+        subset.save_font(font, out, options)
+    finally:
+        font.close()
+    return out.getvalue()
+
+
+def self_hosted_fonts(render, out_dir):
+    """ページで使う文字だけのフォントを out_dir/webfonts/ に置き、(@font-face の CSS, <link>, 使うファイル) を返す
+
+    render() はページの断片を返す関数で、自前で配信できるときだけ呼んで文字を集める。
+    サブセットのファイル名は元のフォントと文字集合のハッシュなので、文字集合が
+    変わらなければ作り直さない。fontTools がない、または元のフォントがない書体は
+    Google Fonts から読み込む（その書体がなければ webfonts/ も作らない）。
+    """
+    faces = [face for face in FONT_FACES
+             if os.path.exists(os.path.join(FONT_SOURCE_DIR, face["file"]))]
+    try:
+        lazy_import("fontTools.subset")
+    except ImportError:
+        faces = []
+    if not faces:
+        return "", google_fonts_links(GOOGLE_FONTS), set()
+
+    font_dir = os.path.join(out_dir, FONT_OUTPUT_DIR_NAME)
+    os.makedirs(font_dir, exist_ok=True)
+
+    try:
+        lazy_import("brotli")
+        flavor = "woff2"
+    except ImportError:
+        flavor = "woff"   # WOFF2 の圧縮には brotli が要る
+    glyphs = page_glyphs(render())
+    css = []
+    written = set()
+    for face in faces:
+        source_path = os.path.join(FONT_SOURCE_DIR, face["file"])
+        with open(source_path, "rb") as f:
+            source_digest = hashlib.sha1(f.read()).hexdigest()
+        stem = os.path.splitext(face["file"])[0]
+        name = f"{stem}.{content_hash(source_digest, flavor, glyphs)[:12]}.{flavor}"
+        path = os.path.join(font_dir, name)
+        if not os.path.exists(path):
+            started = time.monotonic()
+            data = subset_font(source_path, glyphs, flavor)
+            tmp_path = f"{path}.tmp.{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            print(f"  🔤 {face['family']} {face['weight']}: {len(glyphs)}字のサブセットを作成"
+                  f"（{len(data) / 1024:.0f}KB, {time.monotonic() - started:.1f}秒）")
+        written.add(f"{FONT_OUTPUT_DIR_NAME}/{name}")
+        css.append(FONT_FACE_TEMPLATE.substitute(
+            family=face["family"], weight=face["weight"],
+            src=f"{FONT_OUTPUT_DIR_NAME}/{name}", format=flavor,
+        ))
+    hosted = {face["family"] for face in faces}
+    links = google_fonts_links([f for f in GOOGLE_FONTS if f not in hosted])
+    return "".join(css), links, written
 
 
 # ===================== HTML生成 =====================
 
+DEFAULT_READER = "Matsuco"   # 挨拶に出す名前（プロファイルごとに変えられる）
+STALE_NOTE = "・前回取得分"    # 取得に失敗して前回のアイテムを出しているカードに添える
+
 SOURCE_COLORS = {
     "ochiai_note": {"text": "#8B5E3C", "bg": "#FFF5ED", "badge_bg": "#F5E0CE"},
     "ochiai_yt":   {"text": "#8B5E3C", "bg": "#FFF5ED", "badge_bg": "#F5E0CE"},
@@ -694,89 +2725,44 @@ SOURCE_COLORS = {
     "wired_jp":    {"text": "#00695C", "bg": "#E0F2F1", "badge_bg": "#B2DFDB"},
 }
 
-def generate_html(all_items, output_path):
-    """色分け、画像、更新ボタンを含むHTMLを生成"""
-    all_items.sort(key=lambda x: x["date"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
-
-    now_jst = datetime.now(JST)
-    date_str = now_jst.strftime("%Y年%m月%d日")
-    day_names = ["月", "火", "水", "木", "金", "土", "日"]
-    day_str = day_names[now_jst.weekday()]
-    time_str = now_jst.strftime("%-H:%M")
-    hour = now_jst.hour
-
-    if hour < 11:
-        greeting = "おはよう、Matsuco👋🏻"
-    elif hour < 17:
-        greeting = "こんにちは、Matsuco👋🏻"
-    else:
-        greeting = "こんばんは、Matsuco👋🏻"
-
-    sekki, kou_name, kou_reading, seasonal_desc = get_seasonal_message()
-    
-    # ニュース項目の生成
-    items_html = ""
-    source_counts = {}
-    for item in all_items:
-        source = item.get("source", "不明")
-        source_counts[source] = source_counts.get(source, 0) + 1
-        img_tag = f'<img src="{item["image"]}" class="item-img">' if item.get("image") else ""
-        safe_source = source.replace(' ', '-')
-        
-        items_html += f"""
-        <div class="item" data-source="{source}">
-            {img_tag}
-            <div class="item-meta">
-                <span class="source-tag tag-{safe_source}">{source}</span>
-                <span class="time">{item['time_ago']}</span>
-            </div>
-            <a href="{item['link']}" class="item-title" target="_blank">{item['title']}</a>
-            <div class="item-summary">{item['summary']}</div>
-            <a href="{item['link']}" class="read-more" target="_blank">つづきを読む →</a>
-        </div>
-        """
-
-    filter_buttons = '<div class="filters" id="filters">'
-    filter_buttons += '<button class="filter-btn active" data-filter="all">ぜんぶ</button>'
-    for source, count in sorted(source_counts.items(), key=lambda x: x[1], reverse=True):
-        filter_buttons += f'<button class="filter-btn" data-filter="{source}">{source} <small>{count}</small></button>'
-    filter_buttons += '</div>'
-
-    html_content = f"""
+# ページの部品。string.Template で一度だけ組み立て、値は必ずエスケープしてから埋め込む
+PAGE_HEAD_TEMPLATE = Template("""
     <!DOCTYPE html>
     <html lang="ja">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>けさの手帖 - {date_str}</title>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Noto+Serif+JP:wght@300;400;500;600;700&family=Zen+Maru+Gothic:wght@400;500;700&display=swap');
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{ font-family: "Zen Maru Gothic", "Noto Serif JP", serif; background: #FFFFFF; color: #3A3A3A; line-height: 1.8; letter-spacing: 0.03em; }}
-            .container {{ max-width: 640px; margin: 0 auto; padding: 52px 28px 80px; }}
-            .refresh-container {{ text-align: right; margin-bottom: 24px; }}
-            .refresh-btn {{ padding: 6px 14px; border: 1px solid #ECE6D8; background: #FAF9F6; color: #A08060; border-radius: 20px; font-size: 11px; cursor: pointer; transition: all 0.3s; }}
-            .header {{ margin-bottom: 48px; border-bottom: 1px solid #F5F2EB; padding-bottom: 24px; }}
-            .greeting {{ font-size: 24px; font-weight: 500; color: #5C5446; margin-bottom: 8px; }}
-            .date {{ font-size: 13px; color: #9A9284; }}
-            .season-card {{ background: #FAF9F6; border-radius: 16px; padding: 32px; margin-bottom: 48px; }}
-            .season-sekki {{ font-size: 13px; color: #A08060; margin-bottom: 8px; font-weight: 500; }}
-            .season-kou {{ font-size: 22px; color: #5C5446; margin-bottom: 8px; font-weight: 600; }}
-            .season-desc {{ font-size: 15px; color: #7C7466; line-height: 1.8; }}
-            .item {{ margin-bottom: 52px; border-bottom: 1px solid #F5F2EB; padding-bottom: 32px; }}
-            .item-img {{ width: 100%; height: 200px; object-fit: cover; border-radius: 12px; margin-bottom: 16px; }}
-            .source-tag {{ padding: 2px 10px; border-radius: 12px; font-size: 10px; margin-right: 8px; }}
+        <title>けさの手帖 - $date_str</title>
+$font_links        <style>
+$font_css            * { margin: 0; padding: 0; box-sizing: border-box; }
+            body { font-family: "Zen Maru Gothic", "Noto Serif JP", serif; background: #FFFFFF; color: #3A3A3A; line-height: 1.8; letter-spacing: 0.03em; }
+            .container { max-width: 640px; margin: 0 auto; padding: 52px 28px 80px; }
+            .refresh-container { text-align: right; margin-bottom: 24px; }
+            .refresh-btn { padding: 6px 14px; border: 1px solid #ECE6D8; background: #FAF9F6; color: #A08060; border-radius: 20px; font-size: 11px; cursor: pointer; transition: all 0.3s; }
+            .header { margin-bottom: 48px; border-bottom: 1px solid #F5F2EB; padding-bottom: 24px; }
+            .greeting { font-size: 24px; font-weight: 500; color: #5C5446; margin-bottom: 8px; }
+            .date { font-size: 13px; color: #9A9284; }
+            .season-card { background: #FAF9F6; border-radius: 16px; padding: 32px; margin-bottom: 48px; }
+            .season-sekki { font-size: 13px; color: #A08060; margin-bottom: 8px; font-weight: 500; }
+            .season-kou { font-size: 22px; color: #5C5446; margin-bottom: 8px; font-weight: 600; }
+            .season-desc { font-size: 15px; color: #7C7466; line-height: 1.8; }
+            .item { margin-bottom: 52px; border-bottom: 1px solid #F5F2EB; padding-bottom: 32px; }
+            .item-img { width: 100%; height: 200px; object-fit: cover; border-radius: 12px; margin-bottom: 16px; }
+            .source-tag { padding: 2px 10px; border-radius: 12px; font-size: 10px; margin-right: 8px; }
             /* 色分け設定 */
-            .tag-WIRED-JAPAN {{ background: #E0F2F1; color: #00796B; }}
-            .tag-落合陽一 {{ background: #F5F2EB; color: #7C7466; }}
-            .tag-Hard-Fork {{ background: #FCE4EC; color: #C2185B; }}
-            .tag-Every {{ background: #E3F2FD; color: #1976D2; }}
-            .tag-Moltbook {{ background: #F3E5F5; color: #7B1FA2; }}
-            .tag-Kevin-Kelly {{ background: #EDE7F6; color: #512DA8; }}
-            .tag-Dario-Amodei {{ background: #F1F8E9; color: #33691E; }}
-            .tag-Ted-Chiang {{ background: #EFEBE9; color: #4E342E; }}
-            .item-title {{ display: block; font-size: 18px; font-weight: 600; color: #3A3A3A; text-decoration: none; margin-bottom: 8px; }}
-            .item-summary {{ font-size: 14px; color: #666; margin-bottom: 12px; }}
+            .tag-WIRED-JAPAN { background: #E0F2F1; color: #00796B; }
+            .tag-落合陽一 { background: #F5F2EB; color: #7C7466; }
+            .tag-Hard-Fork { background: #FCE4EC; color: #C2185B; }
+            .tag-Every { background: #E3F2FD; color: #1976D2; }
+            .tag-Moltbook { background: #F3E5F5; color: #7B1FA2; }
+            .tag-Kevin-Kelly { background: #EDE7F6; color: #512DA8; }
+            .tag-Dario-Amodei { background: #F1F8E9; color: #33691E; }
+            .tag-Ted-Chiang { background: #EFEBE9; color: #4E342E; }
+            .item-title { display: block; font-size: 18px; font-weight: 600; color: #3A3A3A; text-decoration: none; margin-bottom: 8px; }
+            .item-summary { font-size: 14px; color: #666; margin-bottom: 12px; }
+            .filters { display: flex; flex-wrap: wrap; gap: 8px; margin-bottom: 40px; }
+            .filter-btn { padding: 4px 12px; border: 1px solid #ECE6D8; background: #FFFFFF; color: #7C7466; border-radius: 16px; font-size: 12px; cursor: pointer; }
+            .filter-btn.active { background: #FAF9F6; color: #A08060; border-color: #A08060; }
         </style>
     </head>
     <body>
@@ -785,30 +2771,993 @@ def generate_html(all_items, output_path):
                 <button class="refresh-btn" onclick="triggerRefresh()">手帖を最新に更新する</button>
             </div>
             <div class="header">
-                <div class="greeting">{greeting}</div>
-                <div class="date">{date_str} ({day_str})  {time_str} 取得</div>
+                <div class="greeting">$greeting</div>
+                <div class="date">$date_str ($day_str)  $time_str 取得</div>
+            </div>
+""")
+
+SEASON_TEMPLATE = Template("""            <div class="season-card">
+                <div class="season-sekki">$sekki</div>
+                <div class="season-kou">$kou_name</div>
+                <div class="season-desc">$seasonal_desc</div>
             </div>
-            <div class="season-card">
-                <div class="season-sekki">{sekki}</div>
-                <div class="season-kou">{kou_name}</div>
-                <div class="season-desc">{seasonal_desc}</div>
+""")
+
+ITEMS_OPEN = """            <div id="items-container">"""
+
+CARD_TEMPLATE = Template("""
+        <div class="item" data-source="$source" data-ts="$ts">
+            $img_tag
+            <div class="item-meta">
+                <span class="source-tag tag-$safe_source">$source</span>
+                <span class="time">$time_ago</span>
             </div>
-            <div id="items-container">{items_html}</div>
+            <a href="$link" class="item-title" target="_blank">$title</a>
+            <div class="item-summary">$summary</div>
+            <a href="$link" class="read-more" target="_blank">つづきを読む →</a>
         </div>
+        """)
+
+IMG_TEMPLATE = Template('<img src="$src" class="item-img"$size loading="lazy" decoding="async">')
+
+FILTER_BUTTON_TEMPLATE = Template(
+    '<button class="filter-btn" data-filter="$source"$shard_attr>$source <small>$count</small></button>'
+)
+
+# 分割出力モードで、残りのカードをシャードから読み込んで並べるスクリプト
+# （ボタンの data-shard がそのソースのシャード。選んだときとページの末尾まで来たときに読む）
+SHARD_LOADER = """        <div id="more-items"></div>
         <script>
-        function triggerRefresh() {{
-            const hookUrl = "https://api.netlify.com/build_hooks/698fddd90daa0f765f996b27";
-            if (confirm("最新の情報を取得しますか？")) {{
-                fetch(hookUrl, {{ method: 'POST' }})
-                    .then(() => alert("職人が更新を開始しました！"))
-                    .catch(() => alert("エラーが発生しました。"));
-            }}
-        }}
+        (() => {
+            const container = document.getElementById("items-container");
+            const sentinel = document.getElementById("more-items");
+            const pending = {};
+            document.querySelectorAll(".filter-btn[data-shard]").forEach((b) => { pending[b.dataset.filter] = b.dataset.shard; });
+
+            function el(tag, className, text) {
+                const node = document.createElement(tag);
+                node.className = className;
+                if (text) node.textContent = text;
+                return node;
+            }
+            function card(shard, [ts, timeAgo, title, summary, link, img, width, height]) {
+                const item = el("div", "item");
+                item.dataset.source = shard.source;
+                item.dataset.ts = ts;
+                if (img) {
+                    const image = el("img", "item-img");
+                    Object.assign(image, { src: img, loading: "lazy", decoding: "async" });
+                    if (width) Object.assign(image, { width, height });
+                    item.append(image);
+                }
+                const meta = el("div", "item-meta");
+                meta.append(el("span", "source-tag tag-" + shard.tag, shard.source), el("span", "time", timeAgo));
+                const titleLink = el("a", "item-title", title);
+                const more = el("a", "read-more", "つづきを読む →");
+                for (const a of [titleLink, more]) Object.assign(a, { href: link, target: "_blank" });
+                item.append(meta, titleLink, el("div", "item-summary", summary), more);
+                return item;
+            }
+            function place(cards) {
+                const filter = document.querySelector(".filter-btn.active").dataset.filter;
+                const items = [...container.querySelectorAll(".item"), ...cards];
+                items.sort((a, b) => b.dataset.ts - a.dataset.ts);
+                for (const item of items) {
+                    item.style.display = (filter === "all" || item.dataset.source === filter) ? "" : "none";
+                    container.insertBefore(item, sentinel);
+                }
+            }
+            function load(sources) {
+                const wanted = sources.filter((source) => pending[source]);
+                const requests = wanted.map((source) => {
+                    const url = pending[source];
+                    delete pending[source];
+                    return fetch(url).then((r) => r.json()).catch(() => { pending[source] = url; return null; });
+                });
+                return Promise.all(requests).then((shards) =>
+                    place(shards.filter(Boolean).flatMap((shard) => shard.cards.map((c) => card(shard, c)))));
+            }
+            document.getElementById("filters").addEventListener("click", (e) => {
+                const btn = e.target.closest(".filter-btn");
+                if (btn && btn.dataset.filter !== "all") load([btn.dataset.filter]);
+            });
+            new IntersectionObserver((entries, observer) => {
+                if (!entries.some((entry) => entry.isIntersecting)) return;
+                observer.disconnect();
+                load(Object.keys(pending));
+            }, { rootMargin: "600px" }).observe(sentinel);
+        })();
         </script>
+"""
+
+PAGE_TAIL = Template("""</div>
+        </div>
+        <script>
+        document.getElementById("filters").addEventListener("click", (e) => {
+            const btn = e.target.closest(".filter-btn");
+            if (!btn) return;
+            document.querySelectorAll(".filter-btn").forEach((b) => b.classList.toggle("active", b === btn));
+            const filter = btn.dataset.filter;
+            document.querySelectorAll(".item").forEach((item) => {
+                item.style.display = (filter === "all" || item.dataset.source === filter) ? "" : "none";
+            });
+        });
+$refresh_script        </script>
     </body>
     </html>
+""")
+
+# 更新ボタンの動作。静的なページはビルドフックを叩き、serve モードでは同じサーバーに頼む
+BUILD_HOOK_REFRESH = """        function triggerRefresh() {
+            const hookUrl = "https://api.netlify.com/build_hooks/698fddd90daa0f765f996b27";
+            if (confirm("最新の情報を取得しますか？")) {
+                fetch(hookUrl, { method: 'POST' })
+                    .then(() => alert("職人が更新を開始しました！"))
+                    .catch(() => alert("エラーが発生しました。"));
+            }
+        }
+"""
+
+# リバースプロキシの下のパスでも動くよう、相対URLで呼ぶ
+SERVER_REFRESH = """        function triggerRefresh() {
+            const btn = document.querySelector(".refresh-btn");
+            const label = btn.textContent;
+            btn.disabled = true;
+            btn.textContent = "更新中…";
+            fetch("refresh", { method: "POST" })
+                .then((r) => {
+                    if (!r.ok) throw new Error(r.status);
+                    if (r.status === 202) alert("いま更新中です。少し待ってから読み込み直してください。");
+                    location.reload();
+                })
+                .catch(() => {
+                    alert("エラーが発生しました。");
+                    btn.disabled = false;
+                    btn.textContent = label;
+                });
+        }
+"""
+
+
+def escape(value):
+    return html.escape(str(value) if value is not None else "", quote=True)
+
+
+def safe_url(url):
+    """http(s) 以外（javascript: など）のURLは埋め込まない"""
+    if not url or urlsplit(url).scheme.lower() not in ("http", "https"):
+        return "#"
+    return escape(url)
+
+
+def render_card(item):
+    source = item.get("source", "不明")
+    thumb = item.get("thumb")
+    if thumb:
+        size = f' width="{thumb["width"]}" height="{thumb["height"]}"'
+        img_tag = IMG_TEMPLATE.substitute(src=escape(thumb["src"]), size=size)
+    elif item.get("image"):
+        img_tag = IMG_TEMPLATE.substitute(src=safe_url(item["image"]), size="")
+    else:
+        img_tag = ""
+    return CARD_TEMPLATE.substitute(
+        source=escape(source),
+        safe_source=escape(source.replace(' ', '-')),
+        ts=item_timestamp(item),
+        img_tag=img_tag,
+        time_ago=escape(item_time_label(item)),
+        link=safe_url(item["link"]),
+        title=escape(item.get("title_ja") or item["title"]),
+        summary=escape(item.get("summary_ja") or item["summary"]),
+    )
+
+
+def item_time_label(item):
+    """カードに出す経過時間。取得できずに前回分を出しているときはそのことも添える"""
+    return item["time_ago"] + (STALE_NOTE if item.get("stale") else "")
+
+
+def item_timestamp(item):
+    """並べ替え用の UNIX 時刻（日時がなければ 0 で末尾へ）"""
+    return int(item["date"].timestamp()) if item.get("date") else 0
+
+
+def render_filter_bar(source_counts, shards=None):
+    shards = shards or {}
+    yield '<div class="filters" id="filters">'
+    yield '<button class="filter-btn active" data-filter="all">ぜんぶ</button>'
+    for source, count in sorted(source_counts.items(), key=lambda x: x[1], reverse=True):
+        shard_attr = f' data-shard="{escape(shards[source])}"' if source in shards else ""
+        yield FILTER_BUTTON_TEMPLATE.substitute(source=escape(source), count=count,
+                                                shard_attr=shard_attr)
+    yield '</div>'
+
+
+def render_page(all_items, now_jst=None, cards=None, shards=None, font_css="", font_links=None,
+                reader=DEFAULT_READER, served=False):
+    """ページを先頭から順に文字列の断片として返す（全体を1つの文字列にはしない）
+
+    cards を渡すとそのカードだけを埋め込み（件数表示は all_items のまま）、
+    shards（ソース名 → シャードのパス）があれば残りを読み込むスクリプトを付ける。
+    font_css / font_links は self_hosted_fonts() の戻り値。省くとフォントは Google Fonts から読み込む。
+    served=True は serve モードのページで、更新ボタンがそのサーバーの /refresh を呼ぶ。
+    """
+    now_jst = now_jst or datetime.now(JST)
+    day_names = ["月", "火", "水", "木", "金", "土", "日"]
+    hour = now_jst.hour
+    if hour < 11:
+        greeting = f"おはよう、{reader}👋🏻"
+    elif hour < 17:
+        greeting = f"こんにちは、{reader}👋🏻"
+    else:
+        greeting = f"こんばんは、{reader}👋🏻"
+    sekki, kou_name, kou_reading, seasonal_desc = get_seasonal_message()
+
+    yield PAGE_HEAD_TEMPLATE.substitute(
+        date_str=now_jst.strftime("%Y年%m月%d日"),
+        day_str=day_names[now_jst.weekday()],
+        time_str=f"{now_jst.hour}:{now_jst.minute:02d}",
+        greeting=escape(greeting),
+        font_css=font_css,
+        font_links=google_fonts_links(GOOGLE_FONTS) if font_links is None else font_links,
+    )
+    yield SEASON_TEMPLATE.substitute(
+        sekki=escape(sekki), kou_name=escape(kou_name), seasonal_desc=escape(seasonal_desc),
+    )
+    source_counts = {}
+    for item in all_items:
+        source = item.get("source", "不明")
+        source_counts[source] = source_counts.get(source, 0) + 1
+    yield from render_filter_bar(source_counts, shards)
+    yield ITEMS_OPEN
+    for item in all_items if cards is None else cards:
+        yield render_card(item)
+    if shards:
+        yield SHARD_LOADER
+    yield PAGE_TAIL.substitute(refresh_script=SERVER_REFRESH if served else BUILD_HOOK_REFRESH)
+
+
+def write_atomic(output_path, chunks):
+    """断片を一時ファイルに書き出し、書き終えてから置き換える（途中の状態を見せない）"""
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+SHARD_DIR_NAME = "data"
+FIRST_SCREEN_CARDS = 12   # 分割出力で HTML に埋め込むカード数
+
+
+def shard_card(item):
+    """シャードに入れるカード1枚分（キー名を繰り返さないよう配列にする）"""
+    thumb = item.get("thumb") or {}
+    image = thumb.get("src") or (item.get("image") if safe_url(item.get("image")) != "#" else "")
+    link = item["link"] if safe_url(item["link"]) != "#" else "#"
+    return [item_timestamp(item), item_time_label(item), item.get("title_ja") or item["title"],
+            item.get("summary_ja") or item["summary"], link, image or "",
+            thumb.get("width"), thumb.get("height")]
+
+
+def write_shards(items, shard_dir):
+    """ソースごとのシャードを書き出し、{ソース名: HTML からの相対パス} を返す
+
+    ファイル名に中身のハッシュを入れるので、ブラウザが古いシャードを使うことはない。
+    """
+    by_source = {}
+    for item in items:
+        by_source.setdefault((item.get("source_key", ""), item.get("source", "不明")), []).append(item)
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = {}
+    for (source_key, source), source_items in by_source.items():
+        data = json.dumps({
+            "source": source,
+            "tag": source.replace(" ", "-"),
+            "cards": [shard_card(item) for item in source_items],
+        }, ensure_ascii=False, separators=(",", ":"))
+        name = f"{source_key or 'items'}.{content_hash(data)[:10]}.json"
+        path = os.path.join(shard_dir, name)
+        if not os.path.exists(path):
+            write_atomic(path, [data])
+        shards[source] = f"{os.path.basename(shard_dir)}/{name}"
+    return shards
+
+
+def prune_assets(out_dir, used):
+    """out_dir の webfonts/ と data/ から、どのページも使っていないファイルを消す"""
+    for dir_name in (FONT_OUTPUT_DIR_NAME, SHARD_DIR_NAME):
+        directory = os.path.join(out_dir, dir_name)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            if f"{dir_name}/{name}" not in used and not name.startswith("."):
+                os.unlink(os.path.join(directory, name))
+
+
+def generate_html(all_items, output_path, first_cards=None, prune=True, reader=DEFAULT_READER):
+    """色分け、画像、更新ボタンを含むHTMLを生成し、ページが使うファイル（相対パス）を返す
+
+    first_cards を指定すると分割出力にする。HTML には新しい順に first_cards 件だけを
+    埋め込み、残りはソースごとの JSON（data/ 以下）に書き出して必要になってから読む。
+    同じ場所に複数のページを書くときは prune=False にし、最後に prune_assets() を呼ぶ。
+    """
+    all_items.sort(key=lambda x: x["date"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    # シャードに回すカードの文字もフォントに入れるため、全カードを描いた内容から文字を集める
+    font_css, font_links, used = self_hosted_fonts(lambda: render_page(all_items, reader=reader), out_dir)
+    if first_cards is None:
+        write_atomic(output_path, render_page(all_items, font_css=font_css, font_links=font_links,
+                                              reader=reader))
+    else:
+        shards = write_shards(all_items[first_cards:], os.path.join(out_dir, SHARD_DIR_NAME))
+        used |= set(shards.values())
+        write_atomic(output_path, render_page(all_items, cards=all_items[:first_cards],
+                                              shards=shards, font_css=font_css, font_links=font_links,
+                                              reader=reader))
+    if prune:
+        prune_assets(out_dir, used)
+    return used
+
+
+# ===================== 取得（並列実行） =====================
+
+FETCH_WORKERS = 6      # 同時に取得するソース数
+SOURCE_TIMEOUT = 30    # 1ソースあたりの締め切り（秒）
+RUN_TIMEOUT = 90       # 取得フェーズ全体の締め切り（秒）
+
+
+def fetch_source(source_key, source):
+    """ソースの type に登録された取得関数を呼び出す"""
+    fetch = FETCHERS.get(source.get("type"))
+    if fetch is None:
+        print(f"  ⚠️ 未対応のソース: {source_key} ({source.get('type')})")
+        return []
+    return fetch(source_key, source)
+
+
+def fetch_sources(sources, max_workers=FETCH_WORKERS,
+                  source_timeout=SOURCE_TIMEOUT, run_timeout=RUN_TIMEOUT):
+    """ソースを並列に取得し、{ソースのキー: アイテム} を返す
+
+    締め切りを過ぎたソース、失敗したソース、失敗が続いて休止中のソースは結果に含めない
+    （成否は HEALTH に記録する。記録・再生ではアーカイブにないだけの失敗で休止させないよう
+    記録しない）。締め切りが縛るのは結果を待つ時間で、スレッドは途中で止められない。
+    見切ったソースは DaemonPool のスレッドで動き続け（各リクエストの timeout で終わる）、
+    プロセスの終了は止めない。
+    """
+    results = {}
+    started = {}
+    track_health = HTTP_MODE == "live"
+
+    def failed(source_key, error):
+        if not track_health:
+            return
+        minutes = HEALTH.record(source_key, False, error)
+        if minutes:
+            print(f"  🚧 {sources[source_key]['name']}: 失敗が続いているため {minutes}分 休止します")
+
+    runnable = {}
+    for key, source in sources.items():
+        until = HEALTH.open_until(key)
+        if until is None:
+            runnable[key] = source
+            continue
+        METRICS.source_done(key, 0, 0, "circuit_open")
+        print(f"  🚧 {source['name']}: 休止中（{until.astimezone(JST):%m/%d %H:%M} まで）")
+
+    def run(source_key, source):
+        started[source_key] = time.monotonic()
+        METRICS.begin_source(source_key)
+        try:
+            return fetch_source(source_key, source)
+        finally:
+            METRICS.end_source()
+
+    run_deadline = time.monotonic() + run_timeout
+    executor = DaemonPool(max(1, max_workers), thread_name_prefix="fetch")
+    pending = {executor.submit(run, key, source): key for key, source in runnable.items()}
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= run_deadline:
+                for future, key in pending.items():
+                    future.cancel()
+                    elapsed = now - started[key] if key in started else 0
+                    METRICS.source_done(key, 0, elapsed, "timeout" if key in started else "cancelled")
+                    print(f"  ⏰ 全体の締め切り超過のため中止: {sources[key]['name']}")
+                    if key in started:
+                        failed(key, "全体の締め切り超過")
+                break
+
+            done, _ = wait(pending, timeout=min(0.5, run_deadline - now),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                elapsed = time.monotonic() - started.get(key, now)
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    METRICS.source_done(key, 0, elapsed, "error")
+                    print(f"  ❌ {sources[key]['name']}: {e}")
+                    failed(key, e)
+                    continue
+                if track_health:
+                    HEALTH.record(key, True)
+                METRICS.source_done(key, len(results[key]), elapsed, "ok")
+                print(f"  ⏱️ {sources[key]['name']}: {len(results[key])}件 ({elapsed:.1f}秒)")
+
+            now = time.monotonic()
+            for future, key in list(pending.items()):
+                if key in started and now - started[key] > source_timeout:
+                    del pending[future]
+                    METRICS.source_done(key, 0, now - started[key], "timeout")
+                    print(f"  ⏰ 締め切り超過のため打ち切り: {sources[key]['name']} "
+                          f"({source_timeout:.0f}秒)")
+                    failed(key, f"{source_timeout:.0f}秒の締め切り超過")
+    finally:
+        executor.shutdown()
+
+    for key, items in results.items():
+        for item in items:
+            item["source"] = sources[key]["name"]
+    return results
+
+
+# ===================== 配信（serve モード） =====================
+
+SERVE_ADDRESS = "127.0.0.1:8000"
+SERVE_INTERVAL = 15 * 60       # バックグラウンドで取得し直す間隔（秒）
+SERVE_STALE_AFTER = 5 * 60     # /refresh で取得し直すのは、最後の取得からこれより経ったソースだけ
+SERVE_REFRESH_BUDGET = 5       # /refresh の取得・翻訳・画像それぞれの持ち時間（秒）
+SERVE_GZIP_LEVEL = 9
+ASSET_TYPES = {
+    ".webp": "image/webp",
+    ".jpg": "image/jpeg",
+    ".woff2": "font/woff2",
+    ".woff": "font/woff",
+}
+
+
+class LiveFeed:
+    """serve モードでメモリに持つアイテムと描画済みページ
+
+    アイテムはソースごとに持ち、古くなったソースだけを取得し直して差し替える。
+    ページは描き直すたびに gzip 済みの本文と ETag も作っておき、リクエストには
+    それをそのまま返す。取得から描画までは一度に1つしか走らせない。
+    """
+
+    def __init__(self, sources, out_dir, options, reader=DEFAULT_READER):
+        self.sources = sources
+        self.out_dir = out_dir
+        self.options = options
+        self.reader = reader
+        self.items = {}
+        self.fetched_at = {}
+        self.fonts = set()
+        self.page = None
+        self.lock = threading.Lock()
+        # 起動直後は前回のアイテムで描き、取得はバックグラウンドに任せる
+        for key, source in sources.items():
+            cached = HTTP_CACHE.load_items(key)
+            if cached:
+                for item in cached:
+                    item["source"] = source["name"]
+                self.items[key] = cached
+        ITEM_STORE.apply(self.all_items())
+        self.render()
+
+    def all_items(self):
+        return [item for key in self.sources for item in self.items.get(key, [])]
+
+    def refresh(self, max_age, budget=None):
+        """最後の取得から max_age 秒を超えたソースだけを取得し直し、ページを描き直す
+
+        {"refreshed": 取得できたソース, "skipped": 休止中で取得しなかったソース,
+        "failed": 取得に失敗したソース} を返す。budget（秒）を指定すると取得・翻訳・
+        画像の持ち時間をそれに抑え、別の更新が走っていれば待たずに None を返す。
+        """
+        global METRICS
+        if not self.lock.acquire(blocking=budget is None):
+            return None
+        try:
+            now = time.monotonic()
+            stale = {key: source for key, source in self.sources.items()
+                     if now - self.fetched_at.get(key, float("-inf")) > max_age}
+            outcome = {"refreshed": [], "skipped": [], "failed": []}
+            if not stale:
+                return outcome
+            outcome["skipped"] = sorted(key for key in stale if HEALTH.open_until(key))
+            METRICS = Metrics()   # 更新1回分を1つの run として記録する
+            try:
+                results = self._refresh(stale, budget)
+            finally:
+                summary = METRICS.summary()
+                METRICS.write(self.options.metrics)
+                print_summary(summary, self.options.metrics)
+            outcome["refreshed"] = sorted(results)
+            outcome["failed"] = sorted(set(stale) - set(results) - set(outcome["skipped"]))
+            return outcome
+        finally:
+            self.lock.release()
+
+    def _refresh(self, stale, budget):
+        options = self.options
+
+        def limit(seconds):
+            return seconds if budget is None else min(seconds, budget)
+
+        with METRICS.stage("fetch") as stage:
+            print(f"📰 {len(stale)}件のソースを取得中...")
+            results = fetch_sources(stale, max_workers=options.workers,
+                                    source_timeout=limit(options.source_timeout),
+                                    run_timeout=limit(options.run_timeout))
+            stage["items"] = sum(len(items) for items in results.values())
+        HEALTH.save()
+        fresh = []
+        for key in stale:
+            if key not in results:
+                # 取得できなかったソースは前回のアイテムを古い内容として出し続ける
+                for item in self.items.get(key, []):
+                    item["stale"] = True
+                continue
+            self.fetched_at[key] = time.monotonic()
+            self.items[key] = results[key]
+            fresh.extend(results[key])
+
+        fresh, _ = dedupe_items(fresh)
+        with METRICS.stage("translate") as stage:
+            changed = ITEM_STORE.apply(fresh)
+            translate_items(changed, options.translate_batch_chars,
+                            options.translate_workers, limit(options.translate_budget))
+            ITEM_STORE.update(fresh)
+            stage["changed"] = len(changed)
+
+        with METRICS.stage("images") as stage:
+            if options.no_images:
+                stage["skipped"] = True
+            else:
+                localize_images(self.all_items(), os.path.join(self.out_dir, IMAGE_DIR_NAME),
+                                workers=options.image_workers, budget=limit(options.image_budget),
+                                prune=not options.source)
+
+        with METRICS.stage("render") as stage:
+            self.render()
+            stage["items"] = len(self.all_items())
+        ITEM_STORE.save()
+        return results
+
+    def render(self):
+        """今のアイテムでページを描き、(本文, gzip 済みの本文, ETag) を差し替える"""
+        items, _ = dedupe_items(self.all_items())
+        items.sort(key=lambda x: x["date"] or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+        for item in items:
+            if item.get("date"):
+                item["time_ago"] = time_ago(item["date"])
+        font_css, font_links, used = self_hosted_fonts(
+            lambda: render_page(items, reader=self.reader), self.out_dir)
+        body = "".join(render_page(items, font_css=font_css, font_links=font_links,
+                                   reader=self.reader, served=True)).encode("utf-8")
+        self.page = (body, gzip.compress(body, SERVE_GZIP_LEVEL), hashlib.sha1(body).hexdigest()[:16])
+        # このサーバーが作って、もう使わなくなったサブセットだけを消す
+        for path in self.fonts - used:
+            try:
+                os.unlink(os.path.join(self.out_dir, path))
+            except OSError:
+                pass
+        self.fonts = used
+
+
+def accepts_gzip(accept_encoding):
+    """Accept-Encoding が gzip を受け付けるか（q=0 は拒否）"""
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return not re.fullmatch(r"q=0(\.0*)?", params.replace(" ", "").lower())
+    return False
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """LiveFeed（server.feed）のページと、画像・フォントのファイルを返す
+
+    ページ内の URL はすべて相対なので、リバースプロキシでサブパスに置いてもよい。
+    """
+
+    server_version = "MyDailyFeed"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.respond(head=False)
+
+    def do_HEAD(self):
+        self.respond(head=True)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if urlsplit(self.path).path != "/refresh":
+            return self.send_bytes(404, b"not found\n", "text/plain; charset=utf-8")
+        feed = self.server.feed
+        outcome = feed.refresh(feed.options.stale_after, SERVE_REFRESH_BUDGET)
+        if outcome is None:
+            status, data = 202, {"running": True}   # 別の更新が走っている
+        else:
+            status, data = 200, dict(outcome, etag=f'"{feed.page[2]}"')
+        self.send_bytes(status, json.dumps(data).encode("utf-8"), "application/json",
+                        {"Cache-Control": "no-store"})
+
+    def respond(self, head):
+        path = urlsplit(self.path).path
+        parts = path.split("/")
+        if path in ("/", "/index.html"):
+            self.send_page(head)
+        elif len(parts) == 3 and parts[1] in (IMAGE_DIR_NAME, FONT_OUTPUT_DIR_NAME):
+            self.send_asset(parts[1], parts[2], head)
+        else:
+            self.send_bytes(404, b"not found\n", "text/plain; charset=utf-8", head=head)
+
+    def send_page(self, head):
+        body, compressed, digest = self.server.feed.page
+        use_gzip = accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        # 圧縮の有無で表現が違うので ETag も分ける（どちらで問い合わされても中身は同じ）
+        etag = f'"{digest}-gz"' if use_gzip else f'"{digest}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        tags = {tag.strip().replace("W/", "", 1) for tag in self.headers.get("If-None-Match", "").split(",")}
+        if tags & {f'"{digest}"', f'"{digest}-gz"', "*"}:
+            return self.send_bytes(304, b"", headers=headers, head=True)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        self.send_bytes(200, compressed if use_gzip else body, "text/html; charset=utf-8",
+                        headers, head)
+
+    def send_asset(self, directory, name, head):
+        ext = os.path.splitext(name)[1]
+        if name.startswith(".") or ext not in ASSET_TYPES:
+            return self.send_bytes(404, b"not found\n", "text/plain; charset=utf-8", head=head)
+        try:
+            with open(os.path.join(self.server.feed.out_dir, directory, name), "rb") as f:
+                data = f.read()
+        except OSError:
+            return self.send_bytes(404, b"not found\n", "text/plain; charset=utf-8", head=head)
+        # ファイル名に中身のハッシュが入っているので、ずっとキャッシュしてよい
+        self.send_bytes(200, data, ASSET_TYPES[ext],
+                        {"Cache-Control": "public, max-age=31536000, immutable"}, head)
+
+    def send_bytes(self, status, data, content_type=None, headers=None, head=False):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        headers = getattr(self, "headers", None)
+        client = (headers.get("X-Forwarded-For", "") if headers else "").split(",")[0].strip()
+        print(f"  🌐 {client or self.address_string()} {format % args}")
+
+
+def serve(args):
+    """--serve: ページをメモリに持って配信し、バックグラウンドで取得し直し続ける"""
+    host, _, port = args.serve.rpartition(":")
+    sources = {key: source for key, source in SOURCES.items()
+               if not args.source or key in args.source}
+    feed = LiveFeed(sources, os.path.dirname(os.path.abspath(args.output)), args)
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), FeedRequestHandler)
+    server.daemon_threads = True
+    server.feed = feed
+
+    def refresh_loop():
+        while True:
+            try:
+                # /refresh で取得したばかりのソースは次の回に回す
+                feed.refresh(args.serve_interval / 2)
+            except Exception as e:
+                print(f"  ❌ 更新に失敗しました: {e}")
+            time.sleep(args.serve_interval)
+
+    threading.Thread(target=refresh_loop, name="refresh", daemon=True).start()
+    print(f"🚀 http://{host or '127.0.0.1'}:{port}/ で配信中"
+          f"（{args.serve_interval / 60:.0f}分ごとに取得、Ctrl+C で終了）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def use_scratch_state(directory):
+    """取得予定・失敗の記録・アイテムストア・前回アイテムを directory に置き換える
+
+    記録・再生の実行で使う。本番の .feedcache の状態を読まないので、同じアーカイブを
+    何度再生しても全ソースを取得して同じページを描き、記録にないソースの失敗や
+    ページの指紋が本番の実行に持ち越されることもない。翻訳キャッシュと画像の
+    対応表は内容で引くだけなので本番のものを使う。
     """
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    global HTTP_CACHE, ITEM_STORE, SCHEDULE, HEALTH
+    HTTP_CACHE = HttpCache(directory)
+    ITEM_STORE = ItemStore(os.path.join(directory, "items.json"))
+    SCHEDULE = SourceSchedule(os.path.join(directory, "schedule.json"))
+    HEALTH = SourceHealth(os.path.join(directory, "health.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="My Daily Feed のHTMLを生成します")
+    parser.add_argument("-o", "--output", help="出力するHTMLファイル"
+                        "（既定は index.html、--source 指定時は debug.html）")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS,
+                        help="同時に取得するソース数")
+    parser.add_argument("--source-timeout", type=float, default=SOURCE_TIMEOUT,
+                        help="1ソースあたりの締め切り（秒）")
+    parser.add_argument("--run-timeout", type=float, default=RUN_TIMEOUT,
+                        help="取得フェーズ全体の締め切り（秒）")
+    parser.add_argument("--translate-batch-chars", type=int, default=TRANSLATE_BATCH_CHARS,
+                        help="まとめ翻訳1回分の文字数の上限（0 で1件ずつ翻訳）")
+    parser.add_argument("--translate-workers", type=int, default=TRANSLATE_WORKERS,
+                        help="同時に翻訳リクエストを送るワーカー数")
+    parser.add_argument("--translate-rate", type=float, default=TRANSLATE_RATE,
+                        help="翻訳リクエストの初期速度（回/秒）")
+    parser.add_argument("--translate-budget", type=float, default=TRANSLATE_BUDGET,
+                        help="翻訳フェーズの持ち時間（秒）")
+    parser.add_argument("--image-workers", type=int, default=IMAGE_WORKERS,
+                        help="同時に取得・縮小する画像の数")
+    parser.add_argument("--image-budget", type=float, default=IMAGE_BUDGET,
+                        help="画像処理の持ち時間（秒）")
+    parser.add_argument("--no-images", action="store_true",
+                        help="画像を縮小せず元のURLのまま表示する")
+    parser.add_argument("--shards", nargs="?", type=int, const=FIRST_SCREEN_CARDS,
+                        metavar="N", help="新しい N 件だけを HTML に埋め込み、残りはソースごとの"
+                        f" JSON に分ける（N の既定 {FIRST_SCREEN_CARDS}）")
+    parser.add_argument("--download-fonts", action="store_true",
+                        help="サブセットの元になるフォントを fonts/ に取得して終わる")
+    parser.add_argument("--force", action="store_true",
+                        help="内容が変わっていなくても HTML を生成し直す")
+    parser.add_argument("--poll-all", action="store_true",
+                        help="取得スケジュールに関係なく全ソースを取得する")
+    parser.add_argument("--metrics", default=os.path.join(CACHE_DIR, "metrics.jsonl"),
+                        help="計測値を追記する JSON Lines ファイル")
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument("--record", metavar="DIR",
+                           help="受け取ったレスポンスを全て DIR に記録する")
+    transport.add_argument("--replay", metavar="DIR",
+                           help="DIR の記録だけで実行する（ネットワークを使わない）")
+    parser.add_argument("--replay-latency", action="store_true",
+                        help="再生時に記録された所要時間だけ待つ")
+    parser.add_argument("--serve", nargs="?", const=SERVE_ADDRESS, metavar="[HOST:]PORT",
+                        help="HTML を書き出さず、ページをメモリに持って HTTP で配信する"
+                        f"（既定 {SERVE_ADDRESS}）")
+    parser.add_argument("--serve-interval", type=float, default=SERVE_INTERVAL,
+                        help="serve モードでソースを取得し直す間隔（秒）")
+    parser.add_argument("--stale-after", type=float, default=SERVE_STALE_AFTER,
+                        help="serve モードの /refresh で、最後の取得からこの秒数を超えた"
+                        "ソースだけを取得し直す")
+    targets = parser.add_mutually_exclusive_group()
+    targets.add_argument("--source", action="append", choices=list(SOURCES), metavar="KEY",
+                         help="このソースだけ取得する（デバッグ用、複数指定可）")
+    targets.add_argument("--profiles", metavar="FILE",
+                         help="プロファイル定義（JSON）に従って複数のページを生成する")
+    args = parser.parse_args()
+    if args.serve and args.profiles:
+        parser.error("--serve と --profiles は同時に使えません")
+    if args.output is None:
+        args.output = "debug.html" if args.source else "index.html"
+    if args.download_fonts:
+        missing = download_fonts()
+        if missing:
+            parser.exit(1, f"❌ フォントを取得できませんでした: {', '.join(missing)}\n")
+        return
+    METRICS.add_import("fetch_feed", MODULE_LOAD_SECONDS)
+    TRANSLATE_LIMITER.rate = args.translate_rate
+    if args.record:
+        set_transport("record", args.record)
+        print(f"⏺️  レスポンスを {args.record} に記録します")
+    elif args.replay:
+        set_transport("replay", args.replay, args.replay_latency)
+        print(f"⏯️  {args.replay} の記録から再生します（翻訳はキャッシュ済みのものだけ）")
+    if args.record or args.replay:
+        with tempfile.TemporaryDirectory(prefix="feedstate-") as state_dir:
+            use_scratch_state(state_dir)
+            return run(args)
+    return run(args)
+
+
+def run(args):
+    """serve モードで配信するか、build() を1回行って計測を書き出す"""
+    if args.serve:
+        return serve(args)
+    try:
+        build(args)
+    finally:
+        summary = METRICS.summary()
+        METRICS.write(args.metrics)
+        print_summary(summary, args.metrics)
+
 
-def fetch_all_feeds():
+def load_profiles(path):
+    """プロファイル定義（JSON の配列）を読む
+
+    各プロファイルは {"name": 挨拶に出す名前, "output": 出力HTML, "sources": [ソースのキー]}。
+    sources を省くと全ソース。
+    """
+    with open(path, encoding="utf-8") as f:
+        profiles = json.load(f)
+    outputs = set()
+    for profile in profiles:
+        profile.setdefault("name", DEFAULT_READER)
+        profile.setdefault("sources", list(SOURCES))
+        unknown = [key for key in profile["sources"] if key not in SOURCES]
+        if unknown:
+            raise ValueError(f"{path}: 未知のソースです: {', '.join(unknown)}")
+        if not profile.get("output") or profile["output"] in outputs:
+            raise ValueError(f"{path}: output がないか重複しています: {profile.get('output')}")
+        outputs.add(profile["output"])
+    return profiles
+
+
+def build(args):
+    """取得 → 翻訳 → HTML生成 の1回分
+
+    プロファイルが複数あっても、取得と翻訳は全プロファイルのソースを合わせて1回だけ行い、
+    各プロファイルのページはその結果から並列に描く。
+    """
+    profiles = load_profiles(args.profiles) if args.profiles else []
+    if args.profiles and not profiles:
+        print(f"⚠️ {args.profiles} にプロファイルがないため、既定のページだけを生成します")
+    if not profiles:
+        profiles = [{"name": DEFAULT_READER, "output": args.output,
+                     "sources": args.source or list(SOURCES)}]
+    wanted = {key for profile in profiles for key in profile["sources"]}
+    # 削除してよいのは全ソースを描く通常の実行だけ（--source のデバッグ実行では消さない）
+    prune = not args.source
+
+    with METRICS.stage("fetch") as stage:
+        print("📰 フィードを取得中...")
+        sources = {key: source for key, source in SOURCES.items() if key in wanted}
+        # --source のデバッグ実行と --poll-all では予定に関係なく取得する
+        due = {key: source for key, source in sources.items()
+               if args.source or args.poll_all or SCHEDULE.due(key)}
+        results = fetch_sources(due, max_workers=args.workers,
+                                source_timeout=args.source_timeout,
+                                run_timeout=args.run_timeout)
+        all_items = []
+        for key, source in sources.items():
+            if key in results:
+                SCHEDULE.update(key, source, results[key])
+                all_items.extend(results[key])
+                continue
+            # 予定のないソースは前回取得したアイテムを使う。取得に失敗したか休止中の
+            # ソースも前回分を出し、古い内容であることをカードに示す
+            items = HTTP_CACHE.load_items(key) or []
+            for item in items:
+                item["source"] = source["name"]
+                item["stale"] = key in due
+            all_items.extend(items)
+            if key in due:
+                print(f"  🗂️ {source['name']}: 取得できなかったため前回分 {len(items)}件を表示")
+                continue
+            info = SCHEDULE.describe(key)
+            next_due = datetime.fromisoformat(info["next_due"]).astimezone(JST)
+            print(f"  💤 {source['name']}: 前回分 {len(items)}件"
+                  f"（間隔 {info['interval_minutes'] / 60:.1f}時間, 次回 {next_due:%m/%d %H:%M}）")
+        SCHEDULE.save()
+        HEALTH.save()
+        METRICS.set_schedule({key: dict(SCHEDULE.describe(key), fetched=key in due)
+                              for key in sources})
+        HTTP_CACHE.report()
+        stage["items"] = len(all_items)
+        stage["skipped_sources"] = len(sources) - len(due)
+
+    with METRICS.stage("dedupe") as stage:
+        unique, duplicates = dedupe_items(all_items)
+        if duplicates:
+            print(f"\n🧹 重複 {len(duplicates)}件をまとめました")
+            for duplicate, original in duplicates:
+                print(f"  🔗 {duplicate['source']}: {duplicate['title'][:40]} → {original['source']}")
+        stage["duplicates"] = len(duplicates)
+
+    with METRICS.stage("translate") as stage:
+        # 新しいか内容が変わったアイテムだけを翻訳する（重複は残した方だけ）
+        changed = ITEM_STORE.apply(unique)
+        print(f"\n🆕 新規・更新 {len(changed)}件 / 全{len(unique)}件")
+        translate_items(changed, args.translate_batch_chars,
+                        args.translate_workers, args.translate_budget)
+        ITEM_STORE.update(unique)
+        # 残した方のソースを含まないページでは重複の方を出すので、訳を写しておく
+        for duplicate, original in duplicates:
+            for field in TRANSLATED_FIELDS:
+                if field in original:
+                    duplicate[field] = original[field]
+        stage["changed"] = len(changed)
+
+    pages = {}
+    for profile in profiles:
+        keys = set(profile["sources"])
+        out_dir = os.path.dirname(os.path.abspath(profile["output"]))
+        items, _ = dedupe_items([item for item in all_items if item["source_key"] in keys])
+        pages[profile["output"]] = (profile, out_dir, items)
+    out_dirs = {out_dir for _, out_dir, _ in pages.values()}
+
+    with METRICS.stage("images") as stage:
+        if args.no_images:
+            stage["skipped"] = True
+        else:
+            for out_dir in sorted(out_dirs):
+                items = [item for _, page_dir, page_items in pages.values() if page_dir == out_dir
+                         for item in page_items]
+                # 画像の対応表は出力先をまたいで1つなので、出力先が1つのときだけ掃除する
+                localize_images(items, os.path.join(out_dir, IMAGE_DIR_NAME),
+                                workers=args.image_workers, budget=args.image_budget,
+                                prune=prune and len(out_dirs) == 1)
+            stage["local"] = sum(1 for item in all_items if item.get("thumb"))
+
+    with METRICS.stage("render") as stage:
+        def render(output):
+            profile, _, items = pages[output]
+            fingerprint = page_fingerprint(items, profile["name"], args.shards)
+            if (not args.force and fingerprint == ITEM_STORE.page_fingerprints.get(output)
+                    and os.path.exists(output)):
+                return fingerprint, None
+            used = generate_html(list(items), output, first_cards=args.shards, prune=False,
+                                 reader=profile["name"])
+            return fingerprint, used
+
+        with ThreadPoolExecutor(max_workers=len(pages), thread_name_prefix="render") as executor:
+            results = dict(zip(pages, executor.map(render, pages)))
+
+        rendered = 0
+        for output, (fingerprint, used) in results.items():
+            profile, _, items = pages[output]
+            if used is None:
+                print(f"\n💤 前回から変化がないため {output} は更新しません")
+                continue
+            ITEM_STORE.page_fingerprints[output] = fingerprint
+            rendered += 1
+            print(f"\n🎉 {output} を生成しました（{profile['name']}, {len(items)}件）")
+        ITEM_STORE.save()
+
+        # 描き直さなかったページの使うファイルは分からないので、全ページを描いた出力先だけ掃除する
+        if prune:
+            for out_dir in out_dirs:
+                outputs = [output for output, (_, page_dir, _) in pages.items()
+                           if page_dir == out_dir]
+                if all(results[output][1] is not None for output in outputs):
+                    prune_assets(out_dir, set().union(*(results[output][1] for output in outputs)))
+        stage["profiles"] = len(pages)
+        stage["rendered"] = rendered
+        stage["skipped"] = rendered == 0
+        stage["items"] = len(unique)
+
+
+def print_summary(summary, metrics_path):
+    """run レコードを人向けに1行で表示する"""
+    stages = " / ".join(f"{name} {seconds:.1f}秒" for name, seconds in summary["stages"].items())
+    translation = summary["translation"]
+    resting = sum(1 for state in summary.get("schedule", {}).values() if not state["fetched"])
+    resting = f"（休み {resting}）" if resting else ""
+    if summary.get("sources_open"):
+        resting += f"（休止 {summary['sources_open']}）"
+    print(f"\n📊 合計 {summary['seconds']:.1f}秒（{stages}）"
+          f" | ソース {summary['sources_ok']}/{summary['sources']}{resting}"
+          f" | 転送 {summary['bytes'] / 1024:.0f}KB（キャッシュ {summary['cache_hits']}件）"
+          f" | 翻訳 {translation['calls']}回 {translation['chars']}字"
+          f" | import {sum(summary['imports'].values()):.2f}秒"
+          f" → {metrics_path}")
+
+
+MODULE_LOAD_SECONDS = time.perf_counter() - MODULE_LOAD_STARTED
+
+if __name__ == "__main__":
+    main()
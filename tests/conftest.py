@@ -0,0 +1,136 @@
+"""テスト共通の準備: キャッシュ類は使い捨ての場所に置き、fetch_feed を import できるようにする
+
+各テストで使う手元の HTTP サーバー（local_server）、アイテムの組み立て（make_item）、
+build() を動かすための状態と引数（pipeline / build_args）もここに置く。
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+# fetch_feed は import 時に CACHE_DIR を決めるので、その前に設定する
+os.environ["FEED_CACHE_DIR"] = tempfile.mkdtemp(prefix="feedtest-")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import fetch_feed as ff  # noqa: E402
+
+FIXTURES_DIR = os.path.join(ROOT_DIR, "bench", "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def write_archive(directory, url, fixture, content_type="application/rss+xml; charset=utf-8"):
+    """url に fixture の本文を返すだけの再生用アーカイブを作る（--record の形式）"""
+    body = read_fixture(fixture)
+    os.makedirs(os.path.join(directory, "bodies"))
+    with open(os.path.join(directory, "bodies", fixture), "wb") as f:
+        f.write(body)
+    entry = {"method": "GET", "url": url, "status": 200, "reason": "OK",
+             "headers": {"Content-Type": content_type},
+             "body": fixture, "size": len(body), "elapsed": 0.01}
+    with open(os.path.join(directory, "index.jsonl"), "w", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def make_item(source_key, title, link, **fields):
+    item = {"source_key": source_key, "source": source_key, "title": title, "summary": "",
+            "link": link, "image": "", "original_lang": "ja", "date": None, "time_ago": ""}
+    item.update(fields)
+    return item
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """server.pages（パス → (本文, Content-Type, ETag)）を返す。クエリは見ない。ETag が一致すれば 304"""
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        path = urlsplit(self.path).path
+        if path not in self.server.pages:
+            self.send_error(404)
+            return
+        body, content_type, etag = self.server.pages[path]
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """手元に立てた HTTP サーバー。add() したパスだけを返す"""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), LocalHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.pages = {}
+        self.httpd.requests = []
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       kwargs={"poll_interval": 0.05}, daemon=True)
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def add(self, path, body, content_type="application/rss+xml; charset=utf-8", etag=None):
+        self.httpd.pages[path] = (body, content_type, etag)
+        return self.url(path)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}{path}"
+
+
+@pytest.fixture
+def local_server():
+    server = LocalServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """build() が読み書きするキャッシュ・スケジュール・計測を tmp_path に向ける"""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(ff, "HTTP_CACHE", ff.HttpCache(str(cache)))
+    monkeypatch.setattr(ff, "ITEM_STORE", ff.ItemStore(str(cache / "items.json")))
+    monkeypatch.setattr(ff, "SCHEDULE", ff.SourceSchedule(str(cache / "schedule.json")))
+    monkeypatch.setattr(ff, "HEALTH", ff.SourceHealth(str(cache / "health.json")))
+    monkeypatch.setattr(ff, "TRANSLATION_CACHE", ff.TranslationCache(":memory:"))
+    monkeypatch.setattr(ff, "METRICS", ff.Metrics())
+    yield cache
+    ff.set_transport("live")
+
+
+def build_args(output, **overrides):
+    """build() に渡す引数（コマンドラインの既定値に overrides を重ねる）"""
+    args = argparse.Namespace(
+        output=str(output), profiles=None, source=None, poll_all=False, force=False, shards=None,
+        workers=2, source_timeout=10, run_timeout=10,
+        translate_batch_chars=ff.TRANSLATE_BATCH_CHARS, translate_workers=1, translate_budget=1,
+        no_images=True, image_workers=1, image_budget=1, record=None, replay=None,
+    )
+    for name, value in overrides.items():
+        setattr(args, name, value)
+    return args
@@ -0,0 +1,50 @@
+"""記録と再生（HttpArchive / RecordingAdapter / ReplayAdapter）のテスト"""
+
+import os
+
+import pytest
+
+import fetch_feed as ff
+from conftest import read_fixture
+
+
+@pytest.fixture
+def fresh_state(tmp_path, monkeypatch):
+    """取得のたびにキャッシュとストアを空にする（再生が前回の結果に頼らないように）"""
+    def reset(name):
+        monkeypatch.setattr(ff, "HTTP_CACHE", ff.HttpCache(str(tmp_path / name / "cache")))
+        monkeypatch.setattr(ff, "ITEM_STORE", ff.ItemStore(str(tmp_path / name / "items.json")))
+    yield reset
+    ff.set_transport("live")
+
+
+def test_replay_returns_the_recorded_items_without_network(tmp_path, local_server, fresh_state):
+    url = local_server.add("/feed.xml", read_fixture("hardfork.xml"), etag='"v1"')
+    source = dict(ff.SOURCES["hardfork"], url=url)
+    archive = str(tmp_path / "archive")
+
+    fresh_state("record")
+    ff.set_transport("record", archive)
+    recorded = ff.fetch_rss("hardfork", source)
+    assert len(local_server.requests) == 1
+    assert os.path.exists(os.path.join(archive, "index.jsonl"))
+
+    fresh_state("replay")
+    ff.set_transport("replay", archive)
+    replayed = ff.fetch_rss("hardfork", source)
+    assert len(local_server.requests) == 1   # 再生ではサーバーに問い合わせない
+    assert replayed == recorded
+
+
+def test_request_missing_from_the_archive_raises_replay_miss(tmp_path, local_server, fresh_state):
+    url = local_server.add("/feed.xml", read_fixture("hardfork.xml"))
+    archive = str(tmp_path / "archive")
+    fresh_state("record")
+    ff.set_transport("record", archive)
+    ff.http_get(url).close()
+
+    ff.set_transport("replay", archive)
+    assert ff.http_get(url).status_code == 200
+    with pytest.raises(ff.ReplayMiss):
+        ff.http_get(local_server.url("/other.xml"))
+    assert local_server.requests == ["/feed.xml"]
@@ -0,0 +1,46 @@
+"""build()（取得 → 翻訳 → HTML生成の1回分）のテスト
+
+ソースは手元の HTTP サーバーから返すので、ネットワークには出ない。
+"""
+
+import sys
+
+import fetch_feed as ff
+from conftest import build_args, read_fixture, write_archive
+
+
+def test_unchanged_youtube_result_does_not_rewrite_the_page(tmp_path, local_server, pipeline,
+                                                           monkeypatch, capsys):
+    # 検索結果の日時は「1日前」などの相対表記なので、取得した時刻によって逆算した日時がずれる
+    local_server.add("/results", read_fixture("youtube_search.html"), "text/html; charset=utf-8")
+    monkeypatch.setattr(ff, "YOUTUBE_SEARCH_URL", local_server.url("/results") + "?q={query}")
+    output = tmp_path / "index.html"
+    args = build_args(output, source=["ochiai_yt"])
+
+    ff.build(args)
+    out = capsys.readouterr().out
+    assert "✅ 5件取得" in out and "index.html を生成しました" in out
+    first = output.read_bytes()
+
+    ff.build(args)
+    assert "変化がないため" in capsys.readouterr().out
+    assert output.read_bytes() == first
+    assert len(local_server.requests) == 2
+
+
+def test_replaying_an_archive_twice_gives_the_same_run(tmp_path, pipeline, monkeypatch, capsys):
+    archive = str(tmp_path / "archive")
+    write_archive(archive, ff.SOURCES["hardfork"]["url"], "hardfork.xml")
+    output = tmp_path / "index.html"
+    monkeypatch.setattr(sys, "argv", ["fetch_feed.py", "--replay", archive, "-o", str(output),
+                                      "--no-images", "--metrics", str(tmp_path / "metrics.jsonl")])
+    runs = []
+    for _ in range(2):
+        ff.main()
+        runs.append(capsys.readouterr().out)
+        assert "index.html を生成しました" in runs[-1]
+        assert "💤" not in runs[-1]
+    assert runs[0].count("✅ 5件取得") == runs[1].count("✅ 5件取得") == 1
+    # 本番のキャッシュ（ここでは pipeline の場所）には予定も休止もページの指紋も書かない
+    assert not any(pipeline.joinpath(name).exists()
+                   for name in ("schedule.json", "health.json", "items.json", "items"))
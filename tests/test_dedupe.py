@@ -0,0 +1,59 @@
+"""dedupe_items / canonical_link のテスト"""
+
+import fetch_feed as ff
+from conftest import make_item
+
+
+def test_canonical_link_ignores_tracking_and_url_forms():
+    assert (ff.canonical_link("https://youtu.be/abc123?si=xyz")
+            == ff.canonical_link("http://www.youtube.com/watch?v=abc123&feature=shared")
+            == ff.canonical_link("https://m.youtube.com/shorts/abc123/"))
+    assert (ff.canonical_link("https://Every.to/p/foo/?utm_source=x&b=2&a=1#top")
+            == ff.canonical_link("https://every.to/p/foo?a=1&b=2"))
+
+
+def test_same_link_from_two_sources_is_merged():
+    items = [make_item("ochiai_yt", "デジタルネイチャーの未来", "https://youtu.be/abc"),
+             make_item("other", "別のタイトル", "https://www.youtube.com/watch?v=abc", image="x.jpg")]
+    kept, duplicates = ff.dedupe_items(items)
+    assert kept == [items[0]]
+    assert duplicates == [(items[1], items[0])]
+    assert items[0]["image"] == "x.jpg"
+
+
+def test_near_duplicate_titles_are_merged():
+    items = [make_item("a", "落合陽一が語るデジタルネイチャーの未来【対談】", "https://a.example/1"),
+             make_item("b", "落合陽一が語る「デジタルネイチャー」の未来 | 対談", "https://b.example/2")]
+    kept, duplicates = ff.dedupe_items(items)
+    assert kept == [items[0]]
+    assert len(duplicates) == 1
+
+
+def test_titles_with_different_numbers_are_kept():
+    items = [make_item("hardfork", "Hard Fork Episode 12: The AI Week in Review", "https://a.example/12"),
+             make_item("hardfork", "Hard Fork Episode 13: The AI Week in Review", "https://a.example/13")]
+    kept, _ = ff.dedupe_items(items)
+    assert kept == items
+
+
+def test_untitled_placeholders_with_different_links_are_kept():
+    items = [make_item("technium", ff.UNTITLED, "https://kk.org/a"),
+             make_item("wired_jp", ff.UNTITLED, "https://wired.jp/b")]
+    kept, duplicates = ff.dedupe_items(items)
+    assert kept == items
+    assert duplicates == []
+
+
+def test_short_titles_with_different_links_are_kept():
+    items = [make_item("hardfork", "Mailbag", "https://example.com/mailbag-1"),
+             make_item("hardfork", "Mailbag", "https://example.com/mailbag-2")]
+    kept, duplicates = ff.dedupe_items(items)
+    assert kept == items
+    assert duplicates == []
+
+
+def test_short_titles_with_the_same_link_are_merged():
+    items = [make_item("a", "Mailbag", "https://example.com/mailbag-1"),
+             make_item("b", "Mailbag", "https://example.com/mailbag-1/")]
+    kept, _ = ff.dedupe_items(items)
+    assert kept == [items[0]]
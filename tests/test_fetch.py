@@ -0,0 +1,122 @@
+"""取得（条件付きGET・アイテムストア）のテスト
+
+手元に立てた HTTP サーバーから hardfork のフィードを返す。ETag が一致すれば 304 を返す。
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import fetch_feed as ff
+from conftest import ROOT_DIR, read_fixture
+
+ETAG = '"hardfork-1"'
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch, local_server):
+    monkeypatch.setattr(ff, "HTTP_CACHE", ff.HttpCache(str(tmp_path / "cache")))
+    monkeypatch.setattr(ff, "ITEM_STORE", ff.ItemStore(str(tmp_path / "items.json")))
+    monkeypatch.setattr(ff, "METRICS", ff.Metrics())
+    ff.set_transport("live")
+    url = local_server.add("/feed.xml", read_fixture("hardfork.xml"), etag=ETAG)
+    return dict(ff.SOURCES["hardfork"], url=url)
+
+
+def fetch(source_key, source):
+    ff.METRICS.begin_source(source_key)
+    try:
+        return ff.fetch_rss(source_key, source)
+    finally:
+        ff.METRICS.end_source()
+
+
+def http_records(url):
+    return [r for r in ff.METRICS.records if r["kind"] == "http" and r["url"] == url]
+
+
+def test_not_modified_feed_is_recorded(source):
+    first = fetch("hardfork", source)
+    assert ff.METRICS.sources["hardfork"]["status"] == 200
+
+    again = fetch("hardfork", source)
+    assert [item["link"] for item in again] == [item["link"] for item in first]
+    totals = ff.METRICS.sources["hardfork"]
+    assert totals["status"] == 304
+    assert totals["requests"] == 1
+    assert totals["cache_hit"] is True
+    assert [r["status"] for r in http_records(source["url"])] == [200, 304]
+
+
+def test_not_modified_without_stored_items_is_recorded_once(source, monkeypatch):
+    # 本文を最後まで読ませて、304 のあとキャッシュの本文から組み立て直せるようにする
+    monkeypatch.setattr(ff, "FEED_KEEP_ITEMS", 1000)
+    monkeypatch.setattr(ff, "FEED_MAX_ENTRIES", 1000)
+    fetch("hardfork", source)
+    os.remove(ff.HTTP_CACHE._path("items", "hardfork.json"))
+
+    items = fetch("hardfork", source)
+    assert items
+    assert ff.METRICS.sources["hardfork"]["status"] == 304
+    assert ff.METRICS.sources["hardfork"]["requests"] == 1
+    assert [r["status"] for r in http_records(source["url"])] == [200, 304]
+
+
+def test_item_store_loads_once_for_concurrent_readers(tmp_path, monkeypatch):
+    link = "https://www.nytimes.com/hardfork/0"
+    path = tmp_path / "items.json"
+    path.write_text(json.dumps({"items": {ff.canonical_link(link): {"summary": "前回分"}}}))
+    store = ff.ItemStore(str(path))
+    real_load = json.load
+    calls = []
+
+    def slow_load(f):
+        calls.append(1)
+        time.sleep(0.05)  # 読み込み中に他のスレッドが get を呼ぶようにする
+        return real_load(f)
+
+    monkeypatch.setattr(ff.json, "load", slow_load)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.get(link))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert results == [{"summary": "前回分"}] * 8
+
+
+HUNG_RUN = """
+import sys, threading
+sys.path.insert(0, sys.argv[1])
+import fetch_feed as ff
+
+class Hung:
+    def translate(self, text):
+        threading.Event().wait()
+
+ff.FETCHERS["hung"] = lambda source_key, source: threading.Event().wait()
+ff.get_translator = lambda: Hung()
+ff.set_transport("live")
+ff.TRANSLATION_CACHE = ff.TranslationCache(":memory:")
+print(ff.fetch_sources({"hung": {"name": "Hung", "type": "hung"}}, run_timeout=0.5))
+print(ff.translate_many(["This is an English sentence"], budget=0.5))
+"""
+
+
+def test_hung_source_and_translation_do_not_keep_the_process_alive(tmp_path):
+    # 締め切りで見切った処理が終わらなくても、プロセスは終了できる
+    env = dict(os.environ, FEED_CACHE_DIR=str(tmp_path / "cache"))
+    started = time.monotonic()
+    done = subprocess.run([sys.executable, "-c", HUNG_RUN, ROOT_DIR], env=env,
+                          capture_output=True, text=True, timeout=30)
+    assert done.returncode == 0, done.stderr
+    lines = done.stdout.splitlines()
+    assert "{}" in lines
+    assert lines[-1] == "{'This is an English sentence': 'This is an English sentence'}"
+    assert time.monotonic() - started < 20
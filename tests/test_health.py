@@ -0,0 +1,123 @@
+"""SourceHealth（失敗が続くソースの休止）と、取得できなかったときの前回分のテスト"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import fetch_feed as ff
+from conftest import build_args, read_fixture
+
+NOW = datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def health(tmp_path):
+    return ff.SourceHealth(str(tmp_path / "health.json"))
+
+
+@pytest.fixture
+def flaky(monkeypatch, pipeline):
+    """呼ばれた回数を数え、fail が立っていれば失敗する取得関数を持つソース"""
+    calls = []
+    state = {"fail": True}
+
+    def fetch(source_key, source):
+        calls.append(source_key)
+        if state["fail"]:
+            raise ValueError("取得できません")
+        return [{"source_key": source_key, "title": "記事", "link": "https://flaky.example/1"}]
+
+    monkeypatch.setitem(ff.FETCHERS, "flaky", fetch)
+    sources = {"flaky": {"name": "Flaky", "type": "flaky"}}
+    return sources, calls, state
+
+
+def fail(health, times, now=NOW):
+    return [health.record("src", False, "エラー", now=now) for _ in range(times)]
+
+
+def test_circuit_opens_after_consecutive_failures(health):
+    first = fail(health, ff.HEALTH_FAILURES_TO_OPEN - 1)
+    assert first == [None] * (ff.HEALTH_FAILURES_TO_OPEN - 1)
+    assert health.open_until("src", now=NOW) is None
+
+    assert fail(health, 1) == [ff.HEALTH_COOLDOWN_MINUTES]
+    until = NOW + timedelta(minutes=ff.HEALTH_COOLDOWN_MINUTES)
+    assert health.open_until("src", now=NOW) == until
+    assert health.open_until("src", now=until) is None
+
+
+def test_cooldown_doubles_up_to_the_cap(health):
+    minutes = fail(health, ff.HEALTH_FAILURES_TO_OPEN + 8)[ff.HEALTH_FAILURES_TO_OPEN - 1:]
+    assert minutes[:5] == [60, 120, 240, 480, 960]
+    assert minutes[5:] == [ff.HEALTH_COOLDOWN_MAX_MINUTES] * 4
+    assert ff.HEALTH_COOLDOWN_MAX_MINUTES == 24 * 60
+
+
+def test_success_resets_the_circuit(health):
+    fail(health, ff.HEALTH_FAILURES_TO_OPEN + 2)
+    assert health.record("src", True, now=NOW) is None
+    assert health.open_until("src", now=NOW) is None
+    # また失敗しても、続けて HEALTH_FAILURES_TO_OPEN 回までは休止しない
+    assert fail(health, ff.HEALTH_FAILURES_TO_OPEN - 1)[-1] is None
+    assert fail(health, 1) == [ff.HEALTH_COOLDOWN_MINUTES]
+
+
+def test_half_open_circuit_allows_a_single_probe(flaky):
+    sources, calls, _ = flaky
+    for _ in range(ff.HEALTH_FAILURES_TO_OPEN):
+        ff.fetch_sources(sources)
+    assert len(calls) == ff.HEALTH_FAILURES_TO_OPEN
+    ff.fetch_sources(sources)
+    assert len(calls) == ff.HEALTH_FAILURES_TO_OPEN   # 休止中は呼ばない
+
+    # 休止が明けたら1回だけ試し、失敗すれば倍の時間また休む
+    ff.HEALTH.sources["flaky"]["open_until"] = (datetime.now(timezone.utc)
+                                                - timedelta(seconds=1)).isoformat()
+    ff.fetch_sources(sources)
+    ff.fetch_sources(sources)
+    assert len(calls) == ff.HEALTH_FAILURES_TO_OPEN + 1
+    until = ff.HEALTH.open_until("flaky")
+    remaining = until - datetime.now(timezone.utc)
+    assert timedelta(minutes=2 * ff.HEALTH_COOLDOWN_MINUTES - 1) < remaining
+    assert remaining <= timedelta(minutes=2 * ff.HEALTH_COOLDOWN_MINUTES)
+
+
+def test_half_open_probe_that_succeeds_closes_the_circuit(flaky):
+    sources, calls, state = flaky
+    for _ in range(ff.HEALTH_FAILURES_TO_OPEN):
+        ff.fetch_sources(sources)
+    ff.HEALTH.sources["flaky"]["open_until"] = (datetime.now(timezone.utc)
+                                                - timedelta(seconds=1)).isoformat()
+    state["fail"] = False
+    assert list(ff.fetch_sources(sources)) == ["flaky"]
+    assert ff.HEALTH.sources["flaky"]["failures"] == 0
+    assert ff.HEALTH.open_until("flaky") is None
+
+
+def test_replay_misses_do_not_open_the_circuit(tmp_path, pipeline):
+    archive = tmp_path / "archive"
+    archive.mkdir()
+    (archive / "index.jsonl").write_text("")
+    ff.set_transport("replay", str(archive))
+    sources = {"hardfork": ff.SOURCES["hardfork"]}
+    for _ in range(ff.HEALTH_FAILURES_TO_OPEN + 1):
+        assert ff.fetch_sources(sources) == {}
+    assert ff.HEALTH.open_until("hardfork") is None
+    assert "hardfork" not in ff.HEALTH.sources
+
+
+def test_failed_source_shows_previous_items_marked_stale(tmp_path, local_server, pipeline,
+                                                         monkeypatch):
+    url = local_server.add("/feed.xml", read_fixture("hardfork.xml"))
+    monkeypatch.setitem(ff.SOURCES, "hardfork", dict(ff.SOURCES["hardfork"], url=url))
+    output = tmp_path / "index.html"
+    args = build_args(output, source=["hardfork"])
+    ff.build(args)
+    assert ff.STALE_NOTE not in output.read_text(encoding="utf-8")
+
+    del local_server.httpd.pages["/feed.xml"]   # 以後は 404
+    ff.build(args)
+    page = output.read_text(encoding="utf-8")
+    assert page.count(ff.STALE_NOTE) == 5
+    assert "Hard Fork" in page
@@ -0,0 +1,97 @@
+"""HTML生成（フォントの読み込み・ページの指紋）のテスト"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+import fetch_feed as ff
+import conftest
+
+
+def make_item(title):
+    return conftest.make_item("hardfork", title, "https://www.nytimes.com/hardfork/0",
+                              source="Hard Fork", date=datetime(2026, 10, 1, tzinfo=timezone.utc),
+                              time_ago="1日前")
+
+
+def write_font(path):
+    """ASCII の数文字だけを持つ小さな TrueType フォントを作る"""
+    fontbuilder = pytest.importorskip("fontTools.fontBuilder")
+    glyphpen = pytest.importorskip("fontTools.pens.ttGlyphPen")
+    names = [".notdef"] + [f"g{ord(c)}" for c in "AB"]
+    builder = fontbuilder.FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(c): f"g{ord(c)}" for c in "AB"})
+    pen = glyphpen.TTGlyphPen(None)
+    pen.moveTo((0, 0))
+    pen.lineTo((0, 500))
+    pen.lineTo((500, 0))
+    pen.closePath()
+    glyph = pen.glyph()
+    builder.setupGlyf({name: glyph for name in names})
+    builder.setupHorizontalMetrics({name: (600, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(str(path))
+
+
+def test_google_fonts_do_not_block_rendering(tmp_path, monkeypatch):
+    monkeypatch.setattr(ff, "FONT_SOURCE_DIR", str(tmp_path / "fonts"))
+    output = tmp_path / "out" / "index.html"
+    output.parent.mkdir()
+    assert ff.generate_html([make_item("テスト")], str(output)) == set()
+
+    html = output.read_text(encoding="utf-8")
+    head = html.split("<style>")[0]
+    assert "@import" not in html
+    assert 'media="print" onload="this.media=\'all\'"' in head
+    assert "<noscript><link rel=\"stylesheet\"" in head
+    assert "family=Zen+Maru+Gothic" in head and "&amp;display=swap" in head
+    assert not (tmp_path / "out" / ff.FONT_OUTPUT_DIR_NAME).exists()
+
+
+def test_self_hosted_face_is_left_out_of_google_fonts(tmp_path, monkeypatch):
+    pytest.importorskip("fontTools.subset")
+    fonts_dir = tmp_path / "fonts"
+    fonts_dir.mkdir()
+    write_font(fonts_dir / "Test.ttf")
+    monkeypatch.setattr(ff, "FONT_SOURCE_DIR", str(fonts_dir))
+    monkeypatch.setattr(ff, "FONT_FACES", [{"family": "Zen Maru Gothic", "weight": "400", "file": "Test.ttf"}])
+    output = tmp_path / "out" / "index.html"
+    output.parent.mkdir()
+    used = ff.generate_html([make_item("AB")], str(output))
+
+    assert len(used) == 1
+    assert (tmp_path / "out" / next(iter(used))).exists()
+    html = output.read_text(encoding="utf-8")
+    head, style = html.split("<style>", 1)
+    assert "@font-face" in style
+    assert "family=Noto+Serif+JP" in head
+    assert "Zen+Maru+Gothic" not in head
+
+
+def test_page_fingerprint_includes_shard_setting():
+    items = [make_item("テスト")]
+    assert ff.page_fingerprint(items, "Matsuco") == ff.page_fingerprint(items, "Matsuco")
+    assert ff.page_fingerprint(items, "Matsuco") != ff.page_fingerprint(items, "Matsuco", 12)
+    assert ff.page_fingerprint(items, "Matsuco", 12) != ff.page_fingerprint(items, "Matsuco", 24)
+
+
+def test_download_fonts_fetches_missing_faces_only(tmp_path, local_server, monkeypatch):
+    write_font(tmp_path / "served.ttf")
+    font_url = local_server.add("/Font.ttf", (tmp_path / "served.ttf").read_bytes(), "font/ttf")
+    page_url = local_server.add("/NotFont.ttf", b"<!DOCTYPE html><p>404</p>", "text/html")
+    fonts_dir = tmp_path / "fonts"
+    monkeypatch.setattr(ff, "FONT_SOURCE_DIR", str(fonts_dir))
+    monkeypatch.setattr(ff, "FONT_FACES", [
+        {"family": "Zen Maru Gothic", "weight": "400", "file": "A.ttf", "url": font_url},
+        {"family": "Noto Serif JP", "weight": "400", "file": "B.ttf", "url": page_url},
+    ])
+    assert ff.download_fonts() == ["B.ttf"]
+    assert (fonts_dir / "A.ttf").read_bytes() == (tmp_path / "served.ttf").read_bytes()
+    assert not (fonts_dir / "B.ttf").exists()
+
+    assert ff.download_fonts() == ["B.ttf"]
+    assert local_server.requests.count("/Font.ttf") == 1   # 取得済みのものは取り直さない
@@ -0,0 +1,91 @@
+"""SourceSchedule（新着の間隔から取得間隔を決める）のテスト。時刻は now で渡す"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import fetch_feed as ff
+from conftest import build_args, make_item
+
+T0 = datetime(2026, 10, 1, 0, 0, tzinfo=timezone.utc)
+SOURCE = {"name": "テスト"}
+
+
+@pytest.fixture
+def schedule(tmp_path):
+    return ff.SourceSchedule(str(tmp_path / "schedule.json"))
+
+
+def items(*numbers):
+    return [make_item("src", f"記事{n}", f"https://src.example/{n}") for n in numbers]
+
+
+def at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+def interval(schedule):
+    return schedule.describe("src")["interval_minutes"]
+
+
+def test_unknown_source_is_due_and_first_fetch_uses_the_lower_bound(schedule):
+    assert schedule.due("src", now=T0)
+    assert schedule.update("src", SOURCE, items(1), now=T0) is True
+    assert interval(schedule) == ff.POLL_MINUTES[0]
+    assert schedule.describe("src")["next_due"] == at(ff.POLL_MINUTES[0]).isoformat()
+
+
+def test_due_opens_ten_minutes_early(schedule):
+    schedule.update("src", SOURCE, items(1), now=T0)
+    next_due = ff.POLL_MINUTES[0]
+    assert not schedule.due("src", now=at(next_due - ff.POLL_SLACK_MINUTES - 1))
+    assert schedule.due("src", now=at(next_due - ff.POLL_SLACK_MINUTES))
+    assert schedule.due("src", now=at(next_due))
+
+
+def test_cadence_is_a_moving_average_of_gaps_between_new_items(schedule):
+    schedule.update("src", SOURCE, items(1), now=at(0))
+    schedule.update("src", SOURCE, items(1, 2), now=at(240))
+    assert schedule.sources["src"]["cadence_minutes"] == 240
+    assert interval(schedule) == 120
+    schedule.update("src", SOURCE, items(1, 2, 3), now=at(840))
+    assert schedule.sources["src"]["cadence_minutes"] == (240 + 600) / 2
+    assert interval(schedule) == 210
+
+
+def test_time_since_the_last_new_item_stretches_the_interval(schedule):
+    schedule.update("src", SOURCE, items(1), now=at(0))
+    schedule.update("src", SOURCE, items(1, 2), now=at(200))       # cadence 200
+    assert schedule.update("src", SOURCE, items(1, 2), now=at(800)) is False
+    assert interval(schedule) == 300                                # 新着なしで 600 分経過
+
+
+def test_interval_is_clamped_to_poll_minutes(schedule):
+    schedule.update("src", SOURCE, items(1), now=at(0))
+    schedule.update("src", SOURCE, items(1, 2), now=at(30))         # cadence 30 → 15 分
+    assert interval(schedule) == ff.POLL_MINUTES[0]
+    schedule.update("src", SOURCE, items(1, 2), now=at(3030))       # 3000 分新着なし → 1500 分
+    assert interval(schedule) == ff.POLL_MINUTES[1]
+
+    rare = dict(SOURCE, poll_minutes=(60, 48 * 60))
+    schedule.update("src", rare, items(1, 2), now=at(3030))
+    assert interval(schedule) == 1500
+
+
+def test_timed_out_source_keeps_its_schedule(tmp_path, pipeline, monkeypatch):
+    def slow(source_key, source):
+        time.sleep(1)   # 締め切り（0.1秒）の判定は 0.5 秒ごとなので、それより長く待たせる
+        return items(9)
+
+    monkeypatch.setitem(ff.FETCHERS, "slow", slow)
+    monkeypatch.setattr(ff, "SOURCES", {"src": {"name": "テスト", "type": "slow", "emoji": "🐢",
+                                                "platform": "Test"}})
+    past = datetime.now(timezone.utc) - timedelta(hours=3)
+    ff.SCHEDULE.update("src", SOURCE, items(1), now=past)
+    before = dict(ff.SCHEDULE.sources["src"])
+    assert ff.SCHEDULE.due("src")
+
+    ff.build(build_args(tmp_path / "index.html", source_timeout=0.1, run_timeout=5))
+    assert ff.SCHEDULE.sources["src"] == before
+    assert ff.SCHEDULE.due("src")
@@ -0,0 +1,116 @@
+"""serve モード（LiveFeed + FeedRequestHandler）のテスト
+
+ソースは記録と再生のアーカイブで置き換えるので、ネットワークには出ない。
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+import fetch_feed as ff
+from conftest import write_archive
+
+FEED_URL = "https://feeds.example/hardfork.xml"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    write_archive(str(tmp_path / "archive"), FEED_URL, "hardfork.xml")
+    monkeypatch.setattr(ff, "HEALTH", ff.SourceHealth(str(tmp_path / "health.json")))
+    monkeypatch.setattr(ff, "ITEM_STORE", ff.ItemStore(str(tmp_path / "items.json")))
+    ff.set_transport("replay", str(tmp_path / "archive"))
+    # wired_jp は失敗が続いて休止中という状態にしておく
+    for _ in range(ff.HEALTH_FAILURES_TO_OPEN):
+        ff.HEALTH.record("wired_jp", False, "テスト")
+    sources = {
+        "hardfork": dict(ff.SOURCES["hardfork"], url=FEED_URL),
+        "wired_jp": ff.SOURCES["wired_jp"],
+    }
+    options = argparse.Namespace(
+        workers=2, source_timeout=10, run_timeout=10, translate_batch_chars=ff.TRANSLATE_BATCH_CHARS,
+        translate_workers=1, translate_budget=1, no_images=True, image_workers=1, image_budget=1,
+        source=None, stale_after=0, metrics=str(tmp_path / "metrics.jsonl"),
+    )
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (tmp_path / "secret.txt").write_text("secret")
+    feed = ff.LiveFeed(sources, str(out_dir), options)
+    feed.refresh(0)
+    httpd = ff.ThreadingHTTPServer(("127.0.0.1", 0), ff.FeedRequestHandler)
+    httpd.daemon_threads = True
+    httpd.feed = feed
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    ff.set_transport("live")
+
+
+def request(server, method, path, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    try:
+        conn.request(method, path, headers=headers or {})
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_page_is_served_gzipped_with_a_stable_etag(server):
+    status, headers, body = request(server, "GET", "/", {"Accept-Encoding": "gzip"})
+    assert status == 200
+    assert headers["Content-Encoding"] == "gzip"
+    assert headers["Vary"] == "Accept-Encoding"
+    assert "Hard Fork" in gzip.decompress(body).decode("utf-8")
+    _, again, _ = request(server, "GET", "/", {"Accept-Encoding": "gzip"})
+    assert again["ETag"] == headers["ETag"]
+
+    status, plain, body = request(server, "GET", "/")
+    assert status == 200
+    assert "Content-Encoding" not in plain
+    assert b"<!DOCTYPE html>" in body[:200]
+
+
+def test_if_none_match_returns_304(server):
+    _, headers, _ = request(server, "GET", "/", {"Accept-Encoding": "gzip"})
+    status, _, body = request(server, "GET", "/", {"If-None-Match": headers["ETag"]})
+    assert status == 304
+    assert body == b""
+
+
+def test_head_has_headers_but_no_body(server):
+    _, headers, body = request(server, "GET", "/")
+    status, head_headers, head_body = request(server, "HEAD", "/")
+    assert status == 200
+    assert head_body == b""
+    assert head_headers["Content-Length"] == str(len(body))
+    assert head_headers["ETag"] == headers["ETag"]
+
+
+@pytest.mark.parametrize("path", ["/images/../../secret.txt", "/images/..", "/webfonts/.hidden.woff2",
+                                  "/../secret.txt"])
+def test_path_traversal_is_404(server, path):
+    status, _, body = request(server, "GET", path)
+    assert status == 404
+    assert b"secret" not in body
+
+
+def test_refresh_reports_circuit_open_sources_as_skipped(server):
+    status, _, body = request(server, "POST", "/refresh")
+    assert status == 200
+    data = json.loads(body)
+    assert data["refreshed"] == ["hardfork"]
+    assert data["skipped"] == ["wired_jp"]
+    assert data["failed"] == []
+
+
+def test_refresh_while_another_refresh_holds_the_lock_is_202(server):
+    with server.feed.lock:
+        status, _, body = request(server, "POST", "/refresh")
+    assert status == 202
+    assert json.loads(body) == {"running": True}
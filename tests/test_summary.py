@@ -0,0 +1,28 @@
+"""summarize_html（HTML から本文の先頭と最初の画像を拾う）のテスト"""
+
+import pytest
+
+import fetch_feed as ff
+
+
+@pytest.mark.parametrize("offset", [ff.HTML_FEED_CHUNK - 3, ff.HTML_FEED_CHUNK - 1, ff.HTML_FEED_CHUNK])
+def test_word_across_a_chunk_edge_stays_whole(offset):
+    # "Listen" の途中が HTMLParser に渡すチャンクの境目になるように前を埋める
+    prefix = '<div class=""><p>'
+    prefix = prefix.replace('""', '"' + "x" * (offset - len(prefix)) + '"')
+    markup = prefix + 'Listen to the episode</p><img src="cover.jpg"></div>'
+    assert markup.index("Listen") == offset
+    text, image = ff.summarize_html(markup)
+    assert text == "Listen to the episode"
+    assert image == "cover.jpg"
+
+
+def test_long_text_across_a_chunk_edge_stays_whole():
+    words = " ".join(f"word{i}" for i in range(600))
+    text, _ = ff.summarize_html(f"<p>{words}</p>", limit=len(words))
+    assert text == words
+
+
+def test_script_and_style_are_skipped_and_tags_separate_text():
+    markup = "<style>p { color: red }</style><p>Hello<b>world</b></p><script>var x;</script><p>again</p>"
+    assert ff.clean_html(markup) == "Hello world again"
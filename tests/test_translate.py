@@ -0,0 +1,65 @@
+"""translate_many のまとめ翻訳のテスト（翻訳サービスには問い合わせない）"""
+
+import pytest
+
+import fetch_feed as ff
+
+TEXTS = [f"This is English sentence number {i}" for i in range(31)]
+
+
+class Recorder:
+    """翻訳の呼び出しを記録する。reply(text) が訳文を返すか例外を投げる"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.calls = []
+
+    def translate(self, text):
+        self.calls.append(text)
+        return self.reply(text)
+
+
+@pytest.fixture
+def translator(monkeypatch):
+    monkeypatch.setattr(ff, "TRANSLATION_CACHE", ff.TranslationCache(":memory:"))
+    monkeypatch.setattr(ff, "TRANSLATE_LIMITER", ff.TokenBucket(1000, capacity=1000, max_rate=1000))
+
+    def install(reply):
+        recorder = Recorder(reply)
+        monkeypatch.setattr(ff, "get_translator", lambda: recorder)
+        return recorder
+    return install
+
+
+def test_batch_is_translated_in_one_request(translator):
+    recorder = translator(lambda text: text.replace("]] ", "]] 訳: "))
+    results = ff.translate_many(TEXTS, batch_chars=5000, workers=1, budget=10)
+    assert len(recorder.calls) == 1
+    assert results[TEXTS[0]] == f"訳: {TEXTS[0]}"
+
+
+def test_throttled_batch_is_not_split(translator):
+    def reply(text):
+        raise Exception("429 Too Many Requests")
+    recorder = translator(reply)
+    results = ff.translate_many(TEXTS, batch_chars=5000, workers=1, budget=10)
+    assert len(recorder.calls) == 1
+    assert all(results[text] == text for text in TEXTS)
+
+
+def test_misaligned_batch_is_retried_one_by_one(translator):
+    recorder = translator(lambda text: "ずれた訳" if "[[" in text else f"訳: {text}")
+    results = ff.translate_many(TEXTS, batch_chars=5000, workers=1, budget=10)
+    assert len(recorder.calls) == 1 + len(TEXTS)
+    assert all(results[text] == f"訳: {text}" for text in TEXTS)
+
+
+def test_cached_translation_survives_a_run_that_never_evicts(tmp_path):
+    path = str(tmp_path / "translations.sqlite3")
+    cache = ff.TranslationCache(path)
+    cache.put(TEXTS[0], "訳")
+    assert cache.get(TEXTS[0]) == "訳"
+    # evict() の前に実行が落ちたつもりで、別の接続から読む
+    assert ff.TranslationCache(path).get(TEXTS[0]) == "訳"
+    # 読んだだけでは書き込みのトランザクションを開いたままにしない
+    assert not cache.conn.in_transaction